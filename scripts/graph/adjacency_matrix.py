@@ -0,0 +1,123 @@
+import mmap
+from array import array
+from contextlib import contextmanager
+from os import PathLike
+from typing import Iterator, TextIO, Union
+
+import numpy as np
+
+from .compact_graph import AnyGraph, CompactGraph
+from .digraph import Digraph
+from .graph import Graph
+
+
+MatrixSource = Union[str, PathLike, TextIO]
+
+
+def read_adjacency_matrix(
+    source: MatrixSource,
+    directional: bool = False,
+    compact: bool = False,
+    vectorized: bool = False,
+    use_mmap: bool = False,
+    first_vertex: int = 1,
+    label: str = 'G',
+) -> AnyGraph:
+    '''
+    Load a graph from a comma-separated adjacency matrix (like ``resources/graph1.txt``).
+
+    The file is read one row at a time, so memory holds a single row of text
+    plus the resulting graph. A non-zero value is an edge, values other than 1 become edge weights.
+    The matrix of a non-directional graph must be symmetric, only the upper triangle is used
+    for ``Graph``, rows are taken as is for ``CompactGraph``.
+
+    :param source: A path or an open text file.
+    :param directional: Build a ``Digraph`` (or a directional ``CompactGraph``).
+    :param compact: Build a ``CompactGraph``, rows go straight into its CSR arrays.
+    :param vectorized: Parse every row with NumPy instead of Python loops.
+    :param use_mmap: Read a file given by path through ``mmap``.
+    :param first_vertex: Name of the vertex of the first row, the next rows get the next numbers.
+    '''
+    with _open_rows(source, use_mmap) as rows:
+        parse = _parse_row_vectorized if vectorized else _parse_row
+        parsed = (parse(row) for row in rows if row.strip())
+        if compact:
+            return _read_compact(parsed, directional, first_vertex, label)
+        return _read_graph(parsed, directional, first_vertex, label)
+
+
+@contextmanager
+def _open_rows(source: MatrixSource, use_mmap: bool) -> Iterator[Iterator[str]]:
+    if not isinstance(source, (str, PathLike)):
+        yield iter(source)
+        return
+
+    with open(source, 'rb' if use_mmap else 'r') as file:
+        if not use_mmap:
+            yield iter(file)
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield (line.decode() for line in iter(mapped.readline, b''))
+
+
+def _parse_row(row: str) -> tuple[int, list[int], list[float]]:
+    cells = row.rstrip().rstrip(',').split(',')
+    columns, values = [], []
+    for column, cell in enumerate(cells):
+        value = float(cell)
+        if value:
+            columns.append(column)
+            values.append(value)
+    return len(cells), columns, values
+
+
+def _parse_row_vectorized(row: str) -> tuple[int, np.ndarray, np.ndarray]:
+    # a trailing separator would be parsed as -1
+    cells = np.fromstring(row.rstrip().rstrip(','), sep=',')
+    columns = np.flatnonzero(cells)
+    return len(cells), columns, cells[columns]
+
+
+def _read_graph(rows: Iterator, directional: bool, first_vertex: int, label: str) -> Graph:
+    graph = Digraph(label) if directional else Graph(label)
+    names: list[str] = []
+
+    for i, (width, columns, values) in enumerate(rows):
+        if not names:
+            names = [graph.add_vertex(first_vertex + v).name for v in range(width)]
+        elif width != len(names):
+            raise ValueError(f'Row {i} has {width} values, expected {len(names)}')
+
+        if isinstance(columns, np.ndarray):
+            columns, values = columns.tolist(), values.tolist()
+        for column, value in zip(columns, values):
+            if not directional and column < i:
+                continue
+            graph.add_edge(names[i], names[column], None if value == 1 else float(value))
+
+    return graph
+
+
+def _read_compact(rows: Iterator, directional: bool, first_vertex: int, label: str) -> CompactGraph:
+    offsets = array('i', [0])
+    targets = array('i')
+    weights = array('d')
+
+    expected = None
+
+    for i, (width, columns, values) in enumerate(rows):
+        expected = width if expected is None else expected
+        if width != expected:
+            raise ValueError(f'Row {i} has {width} values, expected {expected}')
+        if isinstance(columns, np.ndarray):
+            targets.frombytes(columns.astype(np.int32).tobytes())
+            weights.frombytes(values.astype(np.float64).tobytes())
+        else:
+            targets.extend(columns)
+            weights.extend(values)
+        offsets.append(len(targets))
+
+    names = [str(first_vertex + v) for v in range(len(offsets) - 1)]
+    if all(weight == 1 for weight in weights):
+        weights = None
+    return CompactGraph(names, offsets, targets, weights, directional, label)
@@ -1,9 +1,23 @@
-from typing import Any, List, Set, Optional, Iterable
-
+import heapq
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, List, Set, Optional, Iterable, Iterator, Sequence
+from weakref import WeakKeyDictionary
+
+import numpy as np
+
+from .compact_graph import AnyGraph, CompactGraph, as_compact_graph
+from .dynamic_distances import DynamicDistances
 from .graph import Graph
 from .helpers import mkg
 from .infinity import inf, InfNum
-from .polynom.polynom import Polynom, PolyToken
+from .lru_cache import LRUCache
+from .matrix import get_adjacency_array, get_floyd_array
+from .polynom import coefficients
+from .polynom.coefficients import Coefficients
+from .polynom.polynom import FrozenPolynom
 from .vertex import Vertex
 
 
@@ -11,104 +25,177 @@ def get_adjacency_matrix(graph: Graph, no_path: Any, self_cross: Any) -> List[Li
     '''
     Get a graph adjacency matrix.
 
+    A list wrapper around ``get_adjacency_array``.
+
     :param graph: Target graph.
     :param no_path: A value to be put in matrix if there is no edge connecting vertices.
     :param self_cross: A value to be put in matrix for self-crossing vertices (if there is no cycle edge).
 
     :return: Target graph adjacency matrix
     '''
-    adjacency_matrix = [[None for _ in range(len(graph))] for _ in range(len(graph))]
-
-    for row, v1 in enumerate(graph.vertices):
-        for col, v2 in enumerate(graph.vertices):
-            edge = graph.get_edge(v1.name, v2.name, default=None)
-
-            if edge is None:
-                val = self_cross if row == col else no_path
-                adjacency_matrix[row][col] = val
-                continue
+    adjacency = get_adjacency_array(graph, np.nan, np.nan)
+    adjacency_matrix = _array_to_matrix(adjacency)
 
-            adjacency_matrix[row][col] = edge.weight if edge.weight is not None else 1
+    for row, values in enumerate(adjacency_matrix):
+        for col, value in enumerate(values):
+            if value != value:  # nan
+                values[col] = self_cross if row == col else no_path
 
     return adjacency_matrix
 
 
-def get_floyd_matrix(graph: Graph):
+def get_floyd_matrix(graph: Graph) -> List[List[InfNum]]:
     # Алгоритм Флойда-Уоршелла
+    return _array_to_matrix(get_floyd_array(graph))
 
-    n = len(graph)
-    d = get_adjacency_matrix(graph, inf, 0)
 
-    for k in range(n):
-        for j in range(n):
-            for i in range(n):
-                d[i][j] = min(d[i][j], d[i][k] + d[k][j])
+def _array_to_matrix(array: np.ndarray) -> List[List[InfNum]]:
+    return [
+        [inf if value == np.inf else int(value) if value.is_integer() else value for value in row]
+        for row in array.tolist()
+    ]
 
-    return d
 
+def _get_names(graph: AnyGraph) -> list[str]:
+    if isinstance(graph, CompactGraph):
+        return graph.names
+    return [v.name for v in graph]
 
-def get_eccentricities(graph: Graph) -> list[int]:
-    # Нахождение эксцентриситетов
 
-    n = len(graph)
-    d = get_floyd_matrix(graph)
+class EccentricityEngine:
+    '''
+    Computes eccentricities of all vertices with a single-source search from every vertex.
+
+    Uses BFS when no edge has a weight and Dijkstra with a binary heap otherwise,
+    so the whole pass costs O(V * (V + E)) (times log V for weighted graphs).
+    Graphs with negative weights go through Floyd-Warshall instead.
+    Results are cached per graph and reused until the graph version changes.
+    Call ``invalidate`` after changing edge weights in place.
+    A graph with ``DynamicDistances`` attached gets its eccentricities from there in O(V).
+    '''
+
+    _cache: WeakKeyDictionary = WeakKeyDictionary()
+
+    @classmethod
+    def get_eccentricities(cls, graph: AnyGraph) -> list[InfNum]:
+        if isinstance(graph, Graph):
+            distances = DynamicDistances.get_attached(graph)
+            if distances is not None:
+                return distances.get_eccentricities()
 
-    e = []
+        cached = cls._cache.get(graph)
+        if cached is not None and cached[0] == graph.version:
+            return list(cached[1])
 
-    for row in range(n):
-        e.append(max(d[row]))
+        eccentricities = cls._compute(graph)
+        cls._cache[graph] = (graph.version, eccentricities)
+        return list(eccentricities)
 
-    return e
+    @classmethod
+    def invalidate(cls, graph: AnyGraph) -> None:
+        cls._cache.pop(graph, None)
 
+    @classmethod
+    def _compute(cls, graph: AnyGraph) -> list[InfNum]:
+        compact = as_compact_graph(graph)
+        n = len(compact)
+        weights = compact.weights
+        if weights is not None and any(w < 0 for w in weights):
+            # Dijkstra does not handle negative weights, Floyd-Warshall does
+            return [max(row) for row in get_floyd_matrix(compact)]
+        if weights is not None and all(float(w).is_integer() for w in weights):
+            # CompactGraph keeps weights as floats, whole ones give int distances like Floyd-Warshall does
+            weights = [int(w) for w in weights]
+
+        offsets, targets = compact.offsets, compact.targets
+        adjacency = [
+            list(zip(targets[offsets[v]:offsets[v + 1]], [1] * (offsets[v + 1] - offsets[v]) if weights is None
+                     else weights[offsets[v]:offsets[v + 1]]))
+            for v in range(n)
+        ]
+
+        search = cls._bfs if weights is None else cls._dijkstra
+        eccentricities = []
+        for source in range(n):
+            distances = search(adjacency, source)
+            if len(distances) < n:
+                eccentricities.append(inf)
+            else:
+                eccentricities.append(max(distances.values()))
+        return eccentricities
+
+    @staticmethod
+    def _bfs(adjacency: list[list[tuple[int, InfNum]]], source: int) -> dict[int, int]:
+        distances = {source: 0}
+        queue = deque((source,))
+        while queue:
+            v = queue.popleft()
+            d = distances[v] + 1
+            for u, _ in adjacency[v]:
+                if u not in distances:
+                    distances[u] = d
+                    queue.append(u)
+        return distances
+
+    @staticmethod
+    def _dijkstra(adjacency: list[list[tuple[int, InfNum]]], source: int) -> dict[int, InfNum]:
+        distances = {}
+        heap = [(0, source)]
+        while heap:
+            d, v = heapq.heappop(heap)
+            if v in distances:
+                continue
+            distances[v] = d
+            for u, w in adjacency[v]:
+                if u not in distances:
+                    heapq.heappush(heap, (d + w, u))
+        return distances
 
-def get_radius(graph: Graph) -> int:
+
+def get_eccentricities(graph: AnyGraph) -> list[InfNum]:
+    # Нахождение эксцентриситетов
+    return EccentricityEngine.get_eccentricities(graph)
+
+
+def get_radius(graph: AnyGraph) -> InfNum:
     eccentricities = get_eccentricities(graph)
     radius = min(eccentricities)
     return radius
 
 
-def get_diameter(graph: Graph) -> int:
+def get_diameter(graph: AnyGraph) -> InfNum:
     eccentricities = get_eccentricities(graph)
     diameter = max(eccentricities)
     return diameter
 
 
-def get_centers(graph: Graph) -> Set[str]:
+def get_centers(graph: AnyGraph) -> Set[str]:
     eccentricities = get_eccentricities(graph)
-    radius = get_radius(graph)
+    radius = min(eccentricities)
     centers = set()
 
-    for i, e in enumerate(eccentricities):
+    for name, e in zip(_get_names(graph), eccentricities):
         if e == radius:
-            centers.add(graph.vertices[i].name)
+            centers.add(name)
 
     return centers
 
 
-def is_null(graph: Graph) -> bool:
-    return not bool(len(graph.edges))
+def is_null(graph: AnyGraph) -> bool:
+    return not graph.edge_count
 
 
-def get_number_of_edges_to_be_full(graph: Graph) -> int:
+def get_number_of_edges_to_be_full(graph: AnyGraph) -> int:
     n = len(graph)
     return int((n * (n - 1)) / 2)
 
 
-def is_full(graph: Graph) -> bool:
-    return len(graph.edges) == get_number_of_edges_to_be_full(graph)
+def is_full(graph: AnyGraph) -> bool:
+    return graph.edge_count == get_number_of_edges_to_be_full(graph)
 
 
 def get_adjacent_vertices(graph: Graph, vertex: Vertex) -> List[Vertex]:
-    adjacent_vertices = []
-    for v in graph:
-        e = graph.get_edge(vertex.name, v.name, default=None)
-        if e is None:
-            continue
-        if e.v1 == vertex:
-            adjacent_vertices.append(e.v2)
-        elif e.v2 == vertex:
-            adjacent_vertices.append(e.v1)
-    return adjacent_vertices
+    return graph.successors(vertex.name)
 
 
 def get_not_adjacent_vertices(graph: Graph) -> list[tuple[str, str]]:
@@ -123,7 +210,223 @@ def get_not_adjacent_vertices(graph: Graph) -> list[tuple[str, str]]:
     return not_adjacent_vertices
 
 
+CanonicalForm = tuple[int, tuple[tuple[int, int], ...]]
+
+
+def get_canonical_form(graph: AnyGraph) -> CanonicalForm:
+    '''
+    Get a hashable form of a non-directional graph that does not depend on vertex names.
+
+    Vertices are ordered by colour refinement (degree, then the multiset of neighbour colours,
+    until the partition stops splitting) with ties broken by the vertex order in the graph,
+    and edges are listed between the new vertex numbers.
+    Equal forms always mean isomorphic graphs, isomorphic graphs usually get equal forms.
+
+    :return: A ``(number of vertices, sorted edges)`` pair.
+    '''
+    compact = as_compact_graph(graph)
+    adjacency = [set(compact.adjacent(v)) for v in range(len(compact))]
+    if compact.directional:
+        for v in range(len(compact)):
+            for u in compact.adjacent(v):
+                adjacency[u].add(v)
+    for v, adjacent in enumerate(adjacency):
+        adjacent.discard(v)
+    return _get_canonical_form(adjacency)
+
+
+def _get_canonical_form(adjacency: list[set[int]]) -> CanonicalForm:
+    n = len(adjacency)
+    colors = [len(adjacent) for adjacent in adjacency]
+    classes = len(set(colors))
+    while True:
+        signatures = [(colors[v], tuple(sorted(colors[u] for u in adjacency[v]))) for v in range(n)]
+        palette = {signature: i for i, signature in enumerate(sorted(set(signatures)))}
+        colors = [palette[signature] for signature in signatures]
+        if len(palette) == classes:
+            break
+        classes = len(palette)
+
+    order = sorted(range(n), key=lambda v: colors[v])
+    position = [0] * n
+    for new, old in enumerate(order):
+        position[old] = new
+
+    edges = set()
+    for v, adjacent in enumerate(adjacency):
+        for u in adjacent:
+            a, b = position[v], position[u]
+            edges.add((a, b) if a <= b else (b, a))
+
+    return n, tuple(sorted(edges))
+
+
+def _canonical_form_to_adjacency(form: CanonicalForm) -> list[set[int]]:
+    n, edges = form
+    adjacency = [set() for _ in range(n)]
+    for a, b in edges:
+        adjacency[a].add(b)
+        adjacency[b].add(a)
+    return adjacency
+
+
 class ChromaticPolynomCreator:
+    '''
+    Builds a chromatic polynom by deletion–contraction.
+
+    Results for subgraphs are memoized by their canonical form in a bounded LRU cache,
+    so isomorphic subgraphs met in different branches are solved once.
+    '''
+
+    cache_size = 65536
+    _cache = LRUCache(cache_size)
+    _coefficients_cache = LRUCache(cache_size)
+
+    @classmethod
+    def clear_cache(cls) -> None:
+        cls._cache = LRUCache(cls.cache_size)
+        cls._coefficients_cache = LRUCache(cls.cache_size)
+
+    @classmethod
+    def get_chromatic_coefficients(cls, graph: AnyGraph, workers: Optional[int] = None, depth: Optional[int] = None) -> Coefficients:
+        '''
+        Get the chromatic polynomial as integer coefficients, ``result[i]`` is the coefficient of ``x^i``.
+
+        ``K_n`` is expanded as the falling factorial ``x(x-1)...(x-n+1)`` and ``O_n`` as ``x^n``.
+        Disconnected graphs are solved per component and graphs with cut vertices per block
+        (biconnected component): ``P(G) = P(B_1) * ... * P(B_k) / x^(k - 1)``.
+        Trees, cycles, null and full graphs use closed forms, everything else goes through
+        deletion–contraction (or addition–contraction for dense graphs) on integer edge lists.
+
+        :param graph: Target graph.
+        :param workers: Solve in a process pool of this size. Runs in the current process if not set.
+        :param depth: How many deletion–contraction levels to expand before handing
+            subproblems to the pool. Defaults to enough levels for 4 subproblems per worker.
+        '''
+        form = get_canonical_form(graph)
+        if not workers:
+            return list(cls._get_coefficients(form))
+        return cls._get_coefficients_parallel(form, workers, depth)
+
+    @classmethod
+    def evaluate(cls, graph: AnyGraph, xs: Sequence[int], exact: bool = True) -> np.ndarray:
+        '''
+        Get ``P(graph, x)``, the number of colorings in ``x`` colors, for every ``x`` of ``xs`` at once.
+
+        Uses the integer coefficients and Horner's scheme vectorized over ``xs``.
+
+        :param exact: Compute with Python ints. Otherwise ``float64`` is used, which is faster
+            but only approximate for large values.
+        '''
+        return coefficients.evaluate_many(cls.get_chromatic_coefficients(graph), xs, exact)
+
+    @classmethod
+    def chromatic_number(cls, graph: AnyGraph) -> int:
+        '''Get the smallest number of colors ``k`` with ``P(graph, k) > 0``.'''
+        n = len(graph)
+        if not n:
+            return 0
+        # a graph can always be colored in n colors
+        counts = cls.evaluate(graph, np.arange(1, n + 1))
+        return int(np.argmax(counts > 0)) + 1
+
+    @classmethod
+    def _get_coefficients_parallel(cls, form: CanonicalForm, workers: int, depth: Optional[int]) -> Coefficients:
+        if depth is None:
+            depth = (4 * workers - 1).bit_length()
+
+        # P(G) is the sum of multiplier * known * P(F_1) * ... * P(F_k) / x^shift over the terms,
+        # (known, factors, shift) -> multiplier. Factors are single blocks without a closed form,
+        # the expansion only splits and branches graphs and never solves one.
+        terms = {}
+        _add_chromatic_term(terms, 1, [1], [form], 0)
+        for _ in range(depth):
+            expanded = {}
+            for (known, factors, shift), multiplier in terms.items():
+                if not factors:
+                    _add_chromatic_term(expanded, multiplier, known, [], shift)
+                    continue
+                # branch the biggest factor, the rest are carried over
+                i = max(range(len(factors)), key=lambda k: len(factors[k][1]))
+                rest = factors[:i] + factors[i + 1:]
+                for sign, branch in cls._get_branches(factors[i], _canonical_form_to_adjacency(factors[i])):
+                    _add_chromatic_term(expanded, sign * multiplier, known, [*rest, branch], shift)
+            terms = expanded
+
+        forms = sorted({factor for _, factors, _ in terms for factor in factors})
+        solved = {}
+        if forms:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                solved = dict(zip(forms, executor.map(_solve_chromatic_form, forms)))
+
+        result = []
+        for (known, factors, shift), multiplier in terms.items():
+            product = [multiplier * c for c in known]
+            for factor in factors:
+                product = coefficients.mul(product, solved[factor])
+            result = coefficients.add(result, product[shift:])
+        return result
+
+    @classmethod
+    def _get_coefficients(cls, form: CanonicalForm) -> tuple[int, ...]:
+        coefficients = cls._coefficients_cache.get(form)
+        if coefficients is None:
+            coefficients = tuple(cls._solve_coefficients(form))
+            cls._coefficients_cache[form] = coefficients
+        return coefficients
+
+    @classmethod
+    def _solve_coefficients(cls, form: CanonicalForm) -> Coefficients:
+        adjacency = _canonical_form_to_adjacency(form)
+
+        result = cls._solve_reduced(form, adjacency)
+        if result is not None:
+            return result
+
+        result = []
+        for sign, branch in cls._get_branches(form, adjacency):
+            result = coefficients.add(result, coefficients.mul([sign], cls._get_coefficients(branch)))
+        return result
+
+    @classmethod
+    def _solve_reduced(cls, form: CanonicalForm, adjacency: list[set[int]]) -> Optional[Coefficients]:
+        '''Solve with a closed form or by splitting into components and blocks. Returns None if neither applies.'''
+        reduction = _reduce_chromatic_form(form, adjacency)
+        if reduction is None:
+            return None
+
+        result, factors, shift = reduction
+        for factor in factors:
+            result = coefficients.mul(result, cls._get_coefficients(factor))
+        return result[shift:]
+
+    @classmethod
+    def _get_branches(cls, form: CanonicalForm, adjacency: list[set[int]]) -> list[tuple[int, CanonicalForm]]:
+        '''Get the two smaller graphs (with their signs) the polynomial is the sum of.'''
+        n, edges = form
+
+        if len(edges) > n * (n - 1) // 3:
+            # to K : P(G, x) = P(G + e, x) + P(G / e, x)
+            v1 = next(v for v, adjacent in enumerate(adjacency) if len(adjacent) < n - 1)
+            v2 = next(v for v in range(n) if v != v1 and v not in adjacency[v1])
+            added = [set(adjacent) for adjacent in adjacency]
+            added[v1].add(v2)
+            added[v2].add(v1)
+            return [
+                (1, _get_canonical_form(added)),
+                (1, _get_canonical_form(_contract(adjacency, v1, v2))),
+            ]
+
+        # to O : P(G, x) = P(G - e, x) - P(G / e, x)
+        v1 = min(range(n), key=lambda v: len(adjacency[v]))
+        v2 = max(adjacency[v1], key=lambda v: len(adjacency[v]))
+        removed = [set(adjacent) for adjacent in adjacency]
+        removed[v1].discard(v2)
+        removed[v2].discard(v1)
+        return [
+            (1, _get_canonical_form(removed)),
+            (-1, _get_canonical_form(_contract(adjacency, v1, v2))),
+        ]
 
     @classmethod
     def pick_optimal_strategy(cls, graph: Graph):
@@ -140,29 +443,39 @@ class ChromaticPolynomCreator:
         return str(poly)
 
     @classmethod
-    def _get_chromatic_polynom(cls, graph: Graph, strategy=None) -> Polynom:
-        n = len(graph)
+    def _get_chromatic_polynom(cls, graph: Graph, strategy=None) -> FrozenPolynom:
         strategy = strategy or cls.pick_optimal_strategy(graph)
 
+        key = strategy, get_canonical_form(graph)
+        poly = cls._cache.get(key)
+        if poly is None:
+            poly = cls._solve(graph, strategy)
+            cls._cache[key] = poly
+        return poly
+
+    @classmethod
+    def _solve(cls, graph: Graph, strategy: str) -> FrozenPolynom:
+        n = len(graph)
+
         if strategy == 'O':
             if is_null(graph):
-                return Polynom.from_tokens(PolyToken(f'O_{{{n}}}'))
+                return FrozenPolynom.term(f'O_{{{n}}}')
             return cls.o_strategy(graph)
 
         if strategy == 'K':
             if is_full(graph):
-                return Polynom.from_tokens(PolyToken(f'K_{{{n}}}'))
+                return FrozenPolynom.term(f'K_{{{n}}}')
             return cls.k_strategy(graph)
 
     @classmethod
-    def o_strategy(cls, graph: Graph) -> Polynom:
+    def o_strategy(cls, graph: Graph) -> FrozenPolynom:
         '''to O : P(G_1, x) = P(G, x) - P(G_2, x)'''
         next_strategy = 'O'
 
-        g = graph.copy()
+        g = graph.copy(lazy=True)
         target_edge = g.edges[0].v1.name, g.edges[0].v2.name
         g.remove_edge(*target_edge)
-        g2 = graph.copy()
+        g2 = graph.copy(lazy=True)
         g2.merge_edge(*target_edge)
 
         left = cls._get_chromatic_polynom(g, next_strategy)
@@ -170,14 +483,14 @@ class ChromaticPolynomCreator:
         return left - right
 
     @classmethod
-    def k_strategy(cls, graph: Graph) -> Polynom:
+    def k_strategy(cls, graph: Graph) -> FrozenPolynom:
         '''to K : P(G, x) = P(G_1, x) + P(G_2, x)'''
         next_strategy = 'K'
 
         v1, v2 = get_not_adjacent_vertices(graph)[0]
-        g1 = graph.copy()
+        g1 = graph.copy(lazy=True)
         g1.add_edge(v1, v2)
-        g2 = g1.copy()
+        g2 = g1.copy(lazy=True)
         g2.merge_edge(v1, v2)
 
         left = cls._get_chromatic_polynom(g1, next_strategy)
@@ -185,36 +498,294 @@ class ChromaticPolynomCreator:
         return left + right
 
 
+def _solve_chromatic_form(form: CanonicalForm) -> tuple[int, ...]:
+    # a process pool task, has to be a module level function to be pickled
+    return ChromaticPolynomCreator._get_coefficients(form)
+
+
+def _reduce_chromatic_form(
+    form: CanonicalForm, adjacency: list[set[int]]
+) -> Optional[tuple[Coefficients, list[CanonicalForm], int]]:
+    '''
+    Reduce a graph without solving anything: ``P(G) = known * P(F_1) * ... * P(F_k) / x^shift``.
+
+    Closed forms (null graphs, trees, cycles, full graphs) give ``(known, [], 0)``,
+    components and blocks give ``([1], factors, shift)``. Returns None for a single block without a closed form.
+    '''
+    n, edges = form
+    m = len(edges)
+
+    if m == 0:
+        return coefficients.monomial(n), [], 0
+
+    components = _get_components(adjacency)
+    if len(components) > 1:
+        return [1], [_get_canonical_form(_get_subgraph(adjacency, component)) for component in components], 0
+
+    if m == n - 1:
+        # tree: x(x-1)^(n-1)
+        return coefficients.mul([0, 1], coefficients.power([-1, 1], n - 1)), [], 0
+
+    if m == n and all(len(adjacent) == 2 for adjacent in adjacency):
+        # cycle: (x-1)^n + (-1)^n (x-1)
+        sign = -1 if n % 2 else 1
+        return coefficients.add(coefficients.power([-1, 1], n), [-sign, sign]), [], 0
+
+    if m == n * (n - 1) // 2:
+        return coefficients.falling_factorial(n), [], 0
+
+    blocks = _get_blocks(adjacency)
+    if len(blocks) > 1:
+        # blocks share cut vertices, each shared vertex counted x times too many
+        return [1], [_get_canonical_form(_get_subgraph(adjacency, block)) for block in blocks], len(blocks) - 1
+
+    return None
+
+
+def _add_chromatic_term(
+    terms: dict[tuple[tuple[int, ...], tuple[CanonicalForm, ...], int], int],
+    multiplier: int,
+    known: Sequence[int],
+    factors: list[CanonicalForm],
+    shift: int,
+) -> None:
+    '''Reduce every factor as far as possible and add the product term to ``terms``.'''
+    known = list(known)
+    irreducible = []
+    while factors:
+        factor = factors.pop()
+        reduction = _reduce_chromatic_form(factor, _canonical_form_to_adjacency(factor))
+        if reduction is None:
+            irreducible.append(factor)
+            continue
+        factor_known, factor_factors, factor_shift = reduction
+        known = coefficients.mul(known, factor_known)
+        factors.extend(factor_factors)
+        shift += factor_shift
+
+    key = tuple(known), tuple(sorted(irreducible)), shift
+    terms[key] = terms.get(key, 0) + multiplier
+    if not terms[key]:
+        del terms[key]
+
+
+def _get_components(adjacency: list[set[int]]) -> list[list[int]]:
+    seen = [False] * len(adjacency)
+    components = []
+    for start in range(len(adjacency)):
+        if seen[start]:
+            continue
+        seen[start] = True
+        component = [start]
+        stack = [start]
+        while stack:
+            v = stack.pop()
+            for u in adjacency[v]:
+                if not seen[u]:
+                    seen[u] = True
+                    component.append(u)
+                    stack.append(u)
+        components.append(component)
+    return components
+
+
+def _get_blocks(adjacency: list[set[int]]) -> list[list[int]]:
+    '''
+    Split a graph into blocks (biconnected components and isolated vertices).
+
+    Iterative Tarjan's articulation point search, so deep graphs do not hit the recursion limit.
+    '''
+    n = len(adjacency)
+    order = [-1] * n
+    low = [0] * n
+    counter = 0
+    blocks = []
+
+    for root in range(n):
+        if order[root] != -1:
+            continue
+        order[root] = low[root] = counter
+        counter += 1
+        if not adjacency[root]:
+            blocks.append([root])
+            continue
+
+        stack = [(root, -1, iter(adjacency[root]))]
+        edge_stack = []
+        while stack:
+            v, parent, adjacent = stack[-1]
+            for u in adjacent:
+                if u == parent:
+                    continue
+                if order[u] == -1:
+                    order[u] = low[u] = counter
+                    counter += 1
+                    edge_stack.append((v, u))
+                    stack.append((u, v, iter(adjacency[u])))
+                    break
+                if order[u] < order[v]:
+                    low[v] = min(low[v], order[u])
+                    edge_stack.append((v, u))
+            else:
+                stack.pop()
+                if not stack:
+                    continue
+                p = stack[-1][0]
+                low[p] = min(low[p], low[v])
+                if low[v] >= order[p]:
+                    # p is a cut vertex (or the root), everything above (p, v) is one block
+                    block = set()
+                    while True:
+                        a, b = edge_stack.pop()
+                        block.add(a)
+                        block.add(b)
+                        if a == p and b == v:
+                            break
+                    blocks.append(sorted(block))
+
+    return blocks
+
+
+def _get_subgraph(adjacency: list[set[int]], vertices: list[int]) -> list[set[int]]:
+    index = {v: i for i, v in enumerate(vertices)}
+    return [{index[u] for u in adjacency[v] if u in index} for v in vertices]
+
+
+def _contract(adjacency: list[set[int]], v1: int, v2: int) -> list[set[int]]:
+    '''Merge ``v2`` into ``v1``, dropping loops and parallel edges.'''
+    relabel = [v if v < v2 else v - 1 for v in range(len(adjacency))]
+    relabel[v2] = relabel[v1]
+    contracted = [set() for _ in range(len(adjacency) - 1)]
+    for v, adjacent in enumerate(adjacency):
+        a = relabel[v]
+        for u in adjacent:
+            b = relabel[u]
+            if a != b:
+                contracted[a].add(b)
+    return contracted
+
+
 def is_cycled(
     graph: Graph,
     current_vertex: Vertex,
     visited: dict[Vertex, bool],
     parent_vertex: Optional[Vertex] = None
 ) -> bool:
-    visited[current_vertex] = True
+    '''
+    Search the part of the graph reachable from ``current_vertex`` for a cycle, marking vertices in ``visited``.
 
-    adjacent_vertices = get_adjacent_vertices(graph, current_vertex)
-    for adjacent_vertex in adjacent_vertices:
-        if not visited.get(adjacent_vertex):
-            if is_cycled(graph, adjacent_vertex, visited, current_vertex):
+    The search keeps its own stack, so it does not hit the recursion limit on deep graphs.
+    '''
+    visited[current_vertex] = True
+    parents = {current_vertex: parent_vertex}
+    stack = [current_vertex]
+    while stack:
+        vertex = stack.pop()
+        for adjacent_vertex in get_adjacent_vertices(graph, vertex):
+            if not visited.get(adjacent_vertex):
+                visited[adjacent_vertex] = True
+                parents[adjacent_vertex] = vertex
+                stack.append(adjacent_vertex)
+            elif adjacent_vertex != parents[vertex]:
                 return True
-        elif adjacent_vertex != parent_vertex:
-            return True
 
     return False
 
 
-def is_tree(graph: Graph) -> bool:
-    if len(graph) <= 2:
-        return True
+@dataclass
+class TreeCheck:
+    '''
+    The result of ``check_tree``, true if the graph is a tree.
 
-    visited = {vertex: False for vertex in graph.vertices}
+    :param cycle: Names of the vertices of a cycle in the order around it, None if there is no cycle.
+    :param component_count: Number of connected components, edge directions are ignored.
+    '''
+    is_tree: bool
+    component_count: int
+    cycle: Optional[list[str]] = None
 
-    if is_cycled(graph, graph.vertices[0], visited):
-        return False
+    def __bool__(self) -> bool:
+        return self.is_tree
+
+
+def check_tree(graph: AnyGraph) -> TreeCheck:
+    '''
+    Check that the graph is connected and has no cycles, edge directions are ignored.
+
+    Runs union-find over the edges in O(V + E) without recursion, so it works on trees of millions of vertices.
+    The first edge joining two already connected vertices is reported with the forest path between them as the cycle.
+    '''
+    n = len(graph)
+    parents = array('i', range(n))
+    sizes = array('i', [1]) * n
+    forest = array('i'), array('i')
+    component_count = n
+    cycle = None
+
+    for v1, v2 in _iter_edge_indices(graph):
+        root1, root2 = _find_root(parents, v1), _find_root(parents, v2)
+        if root1 == root2:
+            if cycle is None:
+                names = _get_names(graph)
+                cycle = [names[v] for v in _get_forest_path(n, forest, v2, v1)]
+            continue
+
+        if sizes[root1] < sizes[root2]:
+            root1, root2 = root2, root1
+        parents[root2] = root1
+        sizes[root1] += sizes[root2]
+        forest[0].append(v1)
+        forest[1].append(v2)
+        component_count -= 1
+
+    return TreeCheck(cycle is None and component_count <= 1, component_count, cycle)
+
+
+def _iter_edge_indices(graph: AnyGraph) -> Iterator[tuple[int, int]]:
+    if isinstance(graph, CompactGraph):
+        for v1, v2, _ in graph.iter_edges():
+            yield v1, v2
+        return
+
+    index = {vertex.name: i for i, vertex in enumerate(graph)}
+    for edge in graph.edges:
+        yield index[edge.v1.name], index[edge.v2.name]
+
+
+def _find_root(parents: array, v: int) -> int:
+    # path halving
+    while parents[v] != v:
+        parents[v] = parents[parents[v]]
+        v = parents[v]
+    return v
 
-    # make sure that all vertices are visited
-    return all(visited.values())
+
+def _get_forest_path(n: int, forest: tuple[array, array], source: int, target: int) -> list[int]:
+    adjacency = [[] for _ in range(n)]
+    for v1, v2 in zip(*forest):
+        adjacency[v1].append(v2)
+        adjacency[v2].append(v1)
+
+    previous = {source: source}
+    queue = deque([source])
+    while target not in previous:
+        v = queue.popleft()
+        for u in adjacency[v]:
+            if u not in previous:
+                previous[u] = v
+                queue.append(u)
+
+    path = [target]
+    while path[-1] != source:
+        path.append(previous[path[-1]])
+    return path[::-1]
+
+
+def is_tree(graph: AnyGraph) -> bool:
+    # a tree has one edge less than vertices, which rules out most graphs without looking at the edges
+    if graph.edge_count != max(len(graph) - 1, 0):
+        return False
+    return check_tree(graph).is_tree
 
 
 class TreeNode:
@@ -288,20 +859,54 @@ def get_prufer_code(graph: Graph, root: Vertex) -> list[int]:
 class PruferCodeCreator:
 
     @classmethod
-    def get_prufer_code(cls, graph: Graph, root: Vertex) -> list[int]:
-        graph = graph.copy()
-        code_len = len(graph) - 2
-        code = []
-        while len(code) < code_len:
-            leafs = cls.get_graph_leaves(graph, root, root)
-            min_leaf = min(leafs, key=lambda leaf: int(leaf.name))
-            parent = cls.get_parent(graph, root, min_leaf)
-            code.append(int(parent.name))
+    def get_prufer_code(cls, graph: AnyGraph, root: Optional[Vertex | str] = None) -> list[int]:
+        compact = as_compact_graph(graph)
+        root_index = -1 if root is None else compact.index(root.name if isinstance(root, Vertex) else root)
+        return [int(compact.name(parent)) for _, parent in cls._iter_prufer_code(compact, root_index)]
 
-            graph.remove_edge(parent.name, min_leaf.name)
-            graph.remove_vertex(min_leaf.name)
+    @classmethod
+    def iter_prufer_code(cls, graph: Graph, root: Optional[Vertex] = None) -> Iterator[tuple[Vertex, Vertex]]:
+        '''
+        Yield ``(minimal leaf, its parent)`` for every step of Prüfer encoding.
+
+        Vertex names must be numbers. Works on a degree array and a min-heap of leaves,
+        so the whole code takes O(n log n). The graph is read once before the first step
+        and is not changed, the caller is free to change it between steps.
+
+        :param graph: A tree.
+        :param root: A vertex that is never treated as a leaf.
+        '''
+        vertices = graph.vertices
+        compact = CompactGraph.from_graph(graph)
+        root_index = -1 if root is None else compact.index(root.name)
+        for leaf, parent in cls._iter_prufer_code(compact, root_index):
+            yield vertices[leaf], vertices[parent]
 
-        return code
+    @classmethod
+    def _iter_prufer_code(cls, graph: CompactGraph, root: int) -> Iterator[tuple[int, int]]:
+        # a cycle or a forest would run out of leaves or parents halfway through the code
+        if not is_tree(graph):
+            raise ValueError(f'Graph is not a tree: {repr(graph)}')
+
+        n = len(graph)
+        adjacency = [graph.adjacent(v) for v in range(n)]
+        degree = [len(adjacent) for adjacent in adjacency]
+        removed = [False] * n
+        keys = [int(name) for name in graph.names]
+
+        leaves = [(keys[v], v) for v in range(n) if degree[v] == 1 and v != root]
+        heapq.heapify(leaves)
+
+        for _ in range(n - 2):
+            _, leaf = heapq.heappop(leaves)
+            removed[leaf] = True
+            parent = next(v for v in adjacency[leaf] if not removed[v])
+
+            degree[parent] -= 1
+            if degree[parent] == 1 and parent != root:
+                heapq.heappush(leaves, (keys[parent], parent))
+
+            yield leaf, parent
 
     @classmethod
     def get_graph_leaves(cls, graph: Graph, root: Vertex, vertex: Vertex, collected=None) -> list[Vertex]:
@@ -363,15 +968,39 @@ class PruferCodeCreator:
             previous_layer = this_layer
 
 
+def edges_from_prufer_code(code: Sequence[int]) -> array:
+    '''
+    Decode a Prüfer code into tree edges.
+
+    Counts vertex occurrences once and takes the minimal free leaf from a min-heap,
+    so decoding takes O(n log n).
+
+    :return: A flat ``array('i')`` of ``2 * (len(code) + 1)`` vertex numbers,
+        edge ``i`` is ``(edges[2 * i], edges[2 * i + 1])``.
+    '''
+    n = len(code) + 2
+    occurrences = [0] * (n + 1)
+    for v in code:
+        if not 1 <= v <= n:
+            raise ValueError(f'Prüfer code of length {len(code)} can not contain {v}')
+        occurrences[v] += 1
+
+    leaves = [v for v in range(1, n + 1) if not occurrences[v]]
+    heapq.heapify(leaves)
+
+    edges = array('i')
+    for v1 in code:
+        edges.append(v1)
+        edges.append(heapq.heappop(leaves))
+        occurrences[v1] -= 1
+        if not occurrences[v1]:
+            heapq.heappush(leaves, v1)
+
+    edges.append(heapq.heappop(leaves))
+    edges.append(heapq.heappop(leaves))
+    return edges
+
+
 def graph_from_prufer_code(code: list[int]) -> Graph:
-    available_vertices = [i for i in range(1, len(code) + 3)]
-    edges = []
-    for i, v1 in enumerate(code):
-        left_in_code = code[i:]
-        not_in_code = [v for v in available_vertices if v not in left_in_code]
-        v2 = min(not_in_code)
-        available_vertices.remove(v2)
-        edges.append((str(v1), str(v2)))
-    edges.append((str(available_vertices[0]), str(available_vertices[1])))
-
-    return mkg(edges=edges)
+    edges = edges_from_prufer_code(code)
+    return mkg(edges=[(str(edges[i]), str(edges[i + 1])) for i in range(0, len(edges), 2)])
@@ -0,0 +1,163 @@
+import sys
+from array import array
+from typing import Iterable, Iterator, Optional, Sequence, Union
+
+from .digraph import Digraph
+from .graph import Graph
+from .types import StrConvertable
+
+
+class CompactGraph:
+    '''
+    A read-only graph with vertices numbered ``0..n-1`` and edges stored as CSR arrays.
+
+    Neighbours of vertex ``i`` are ``targets[offsets[i]:offsets[i + 1]]``,
+    ``weights`` (if present) are aligned with ``targets``.
+    A non-directional edge is stored in both directions, a loop once.
+    Vertex names are interned and only used to translate to and from ``Graph``.
+    '''
+
+    def __init__(
+        self,
+        names: Iterable[StrConvertable],
+        offsets: Sequence[int],
+        targets: Sequence[int],
+        weights: Optional[Sequence[float]] = None,
+        directional: bool = False,
+        label: str = 'G',
+    ) -> None:
+        self._names = [sys.intern(str(name)) for name in names]
+        self._index = {name: i for i, name in enumerate(self._names)}
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        self.directional = directional
+        self.label = label
+        self._edge_count: Optional[int] = None
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __repr__(self) -> str:
+        return f'<{self.__class__.__name__} {len(self)} vertices, {self.edge_count} edges>'
+
+    @property
+    def names(self) -> list[str]:
+        return self._names
+
+    @property
+    def edge_count(self) -> int:
+        if self._edge_count is None:
+            if self.directional:
+                self._edge_count = len(self.targets)
+            else:
+                loops = sum(1 for i in range(len(self)) if i in self.adjacent(i))
+                self._edge_count = (len(self.targets) + loops) // 2
+        return self._edge_count
+
+    @property
+    def version(self) -> int:
+        # the graph never changes
+        return 0
+
+    def index(self, name: StrConvertable) -> int:
+        name = str(name)
+        i = self._index.get(name)
+        if i is None:
+            raise KeyError(f'Vertex {name} is not present in the graph.')
+        return i
+
+    def name(self, i: int) -> str:
+        return self._names[i]
+
+    def adjacent(self, i: int) -> Sequence[int]:
+        '''Vertices reachable from ``i`` by one edge.'''
+        return self.targets[self.offsets[i]:self.offsets[i + 1]]
+
+    def adjacent_weights(self, i: int) -> Sequence[float]:
+        '''Weights of the edges to ``adjacent(i)``, all ones for a graph without weights.'''
+        if self.weights is None:
+            return [1] * (self.offsets[i + 1] - self.offsets[i])
+        return self.weights[self.offsets[i]:self.offsets[i + 1]]
+
+    def iter_edges(self) -> Iterator[tuple[int, int, Optional[float]]]:
+        '''Yield every edge once as ``(v1, v2, weight)``.'''
+        offsets, targets, weights = self.offsets, self.targets, self.weights
+        for v1 in range(len(self)):
+            for k in range(offsets[v1], offsets[v1 + 1]):
+                v2 = targets[k]
+                if self.directional or v1 <= v2:
+                    yield v1, v2, None if weights is None else weights[k]
+
+    @classmethod
+    def from_edges(
+        cls,
+        names: Iterable[StrConvertable],
+        edges: Iterable[tuple[int, int]],
+        weights: Optional[Iterable[float]] = None,
+        directional: bool = False,
+        label: str = 'G',
+    ) -> 'CompactGraph':
+        '''
+        Build a graph from vertex names and edges between vertex numbers.
+
+        :param weights: Edge weights in the order of ``edges``.
+        '''
+        names = list(names)
+        edges = list(edges)
+        weights = None if weights is None else list(weights)
+
+        degree = [0] * (len(names) + 1)
+        for v1, v2 in edges:
+            degree[v1 + 1] += 1
+            if not directional and v1 != v2:
+                degree[v2 + 1] += 1
+
+        offsets = array('i', degree)
+        for i in range(len(names)):
+            offsets[i + 1] += offsets[i]
+
+        targets = array('i', bytes(offsets[-1] * array('i').itemsize))
+        edge_weights = None if weights is None else array('d', bytes(offsets[-1] * array('d').itemsize))
+        cursor = array('i', offsets[:-1])
+        for k, (v1, v2) in enumerate(edges):
+            targets[cursor[v1]] = v2
+            if edge_weights is not None:
+                edge_weights[cursor[v1]] = weights[k]
+            cursor[v1] += 1
+            if not directional and v1 != v2:
+                targets[cursor[v2]] = v1
+                if edge_weights is not None:
+                    edge_weights[cursor[v2]] = weights[k]
+                cursor[v2] += 1
+
+        return cls(names, offsets, targets, edge_weights, directional, label)
+
+    @classmethod
+    def from_graph(cls, graph: Graph) -> 'CompactGraph':
+        '''Build a compact copy of ``graph``. Edges without weight get weight 1 if any edge has one.'''
+        names = [v.name for v in graph]
+        index = {name: i for i, name in enumerate(names)}
+        edges = graph.edges
+        pairs = [(index[edge.v1.name], index[edge.v2.name]) for edge in edges]
+        weights = None
+        if any(edge.weight is not None for edge in edges):
+            weights = [1 if edge.weight is None else edge.weight for edge in edges]
+        return cls.from_edges(names, pairs, weights, graph.directional, graph.label)
+
+    def to_graph(self) -> Graph:
+        graph = Digraph(self.label) if self.directional else Graph(self.label)
+        for name in self._names:
+            graph.add_vertex(name)
+        for v1, v2, weight in self.iter_edges():
+            graph.add_edge(self._names[v1], self._names[v2], weight)
+        return graph
+
+
+AnyGraph = Union[Graph, CompactGraph]
+
+
+def as_compact_graph(graph: AnyGraph) -> CompactGraph:
+    if isinstance(graph, CompactGraph):
+        return graph
+    return CompactGraph.from_graph(graph)
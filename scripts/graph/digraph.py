@@ -3,6 +3,7 @@ from typing import Optional
 from .edge import Edge
 from .graph import Graph
 from .types import StrConvertable
+from .vertex import Vertex
 
 
 class Digraph(Graph):
@@ -13,31 +14,47 @@ class Digraph(Graph):
     '''
 
     _dot_name = 'digraph'
+    directional = True
 
-    def add_edge(self, v1: StrConvertable, v2: StrConvertable) -> Edge:
-        edge = super().add_edge(v1, v2)
-        edge.directional = True
-        return edge
+    def neighbors(self, vertex: StrConvertable) -> list[Vertex]:
+        name = str(vertex)
+        self.get_vertex(name)
+        neighbors = {v: edge.v2 for v, edge in self._successors[name].items()}
+        neighbors.update((v, edge.v1) for v, edge in self._predecessors[name].items())
+        return list(neighbors.values())
+
+    def successors(self, vertex: StrConvertable) -> list[Vertex]:
+        '''Get heads of the edges going out of ``vertex``. Runs in O(out degree).'''
+        name = str(vertex)
+        self.get_vertex(name)
+        return [edge.v2 for edge in self._successors[name].values()]
+
+    def predecessors(self, vertex: StrConvertable) -> list[Vertex]:
+        '''Get tails of the edges coming into ``vertex``. Runs in O(in degree).'''
+        name = str(vertex)
+        self.get_vertex(name)
+        return [edge.v1 for edge in self._predecessors[name].values()]
+
+    def get_out_edges(self, vertex: StrConvertable) -> list[Edge]:
+        name = self.get_vertex(vertex).name
+        return list(self._successors[name].values())
 
     def in_degree(self, vertex: StrConvertable) -> int:
-        v2 = self.get_vertex(vertex)
-        in_degree = 0
-        for v1 in self.vertices:
-            edge = self.get_edge(v1.name, v2.name, default=None)
-            if not edge:
-                continue
-            in_degree += 1
-        return in_degree
+        name = self.get_vertex(vertex).name
+        return len(self._predecessors[name])
 
     def out_degree(self, vertex: StrConvertable) -> int:
-        v1 = self.get_vertex(vertex)
-        out_degree = 0
-        for v2 in self.vertices:
-            edge = self.get_edge(v1.name, v2.name, default=None)
-            if not edge:
-                continue
-            out_degree += 1
-        return out_degree
+        name = self.get_vertex(vertex).name
+        return len(self._successors[name])
+
+    def degree_view(self) -> dict[str, tuple[int, int]]:
+        '''
+        Get degrees of all vertices at once.
+
+        :return: A mapping of vertex name to its ``(in_degree, out_degree)`` pair.
+        '''
+        predecessors = self._predecessors
+        return {name: (len(predecessors[name]), len(successors)) for name, successors in self._successors.items()}
 
     def _get_edge_key(self, v1: StrConvertable, v2: StrConvertable) -> Optional[tuple[str, str]]:
         v1, v2 = str(v1), str(v2)
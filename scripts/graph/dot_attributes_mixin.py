@@ -1,15 +1,27 @@
 from abc import ABC, abstractmethod
-from typing import Dict
+from typing import Dict, Optional
 
 
 class DotAttributesMixin(ABC):
+    '''
+    DOT attributes of a graph element.
 
-    _dot_attributes = {}
+    The attributes dict belongs to the instance and is not allocated until first set.
+    Subclasses must set ``_dot_attributes`` to None on init.
+    '''
+
+    __slots__ = ('_dot_attributes',)
+
+    @property
+    def dot_attributes(self) -> Optional[Dict[str, str]]:
+        return self._dot_attributes
 
     def set_dot_attributes(self, dot_data: Dict[str, str] = None):
         self._dot_attributes = dot_data
 
     def update_dot_attributes(self, dot_data: Dict[str, str]):
+        if self._dot_attributes is None:
+            self._dot_attributes = {}
         self._dot_attributes.update(dot_data)
     
     def _get_attributes_string(self):
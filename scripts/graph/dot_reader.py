@@ -0,0 +1,238 @@
+from os import PathLike
+from typing import Iterable, Iterator, Optional, TextIO, Union
+
+from .digraph import Digraph
+from .graph import Graph
+
+
+DotSource = Union[str, PathLike, TextIO]
+
+_EDGE_OPS = ('--', '->')
+_END = ';'
+_PUNCTUATION = ('[', ']', '=', ',', ';', '{', '}')
+
+
+def read_dot(source: DotSource) -> Graph:
+    '''
+    Load a ``graph``/``digraph`` written in DOT into a ``Graph``/``Digraph``.
+
+    The input is read line by line and every statement is applied as soon as it ends,
+    so only the graph itself is kept in memory. Supported are node and edge statements
+    (with edge chains like ``a -- b -- c``), attribute lists and ``node``/``edge`` default attributes.
+    Graph attributes, ports and comments are skipped, subgraphs raise ``ValueError``.
+
+    IDs are unquoted, attribute values are kept verbatim (quotes included)
+    since ``Graph.dot`` writes them as they are. This way ``read_dot`` reads back what ``Graph.dot`` wrote.
+
+    :param source: A path or an open text file.
+    '''
+    if isinstance(source, (str, PathLike)):
+        with open(source) as file:
+            return _DotReader().read(file)
+    return _DotReader().read(source)
+
+
+class _DotReader:
+    def __init__(self) -> None:
+        self.graph: Optional[Graph] = None
+        self.closed = False
+        self.node_defaults: dict[str, str] = {}
+        self.edge_defaults: dict[str, str] = {}
+        self.statement: list[str] = []
+        self.depth = 0
+        self.quoted_parts: list[str] = []
+
+    def read(self, lines: Iterable[str]) -> Graph:
+        for line in lines:
+            if (
+                not self.statement and not self.quoted_parts and self.graph is not None
+                and '"' not in line and ';' not in line and '{' not in line and '}' not in line
+                and '#' not in line and '//' not in line
+            ):
+                # a whole statement on one line, the common case
+                tokens = _split_unquoted(line)
+                if tokens.count('[') == tokens.count(']'):
+                    self._apply(tokens)
+                    continue
+            for token in self._tokenize(line):
+                self._feed(token)
+
+        if self.graph is None or not self.closed or self.statement or self.quoted_parts:
+            raise ValueError('Unexpected end of DOT input')
+        return self.graph
+
+    def _tokenize(self, line: str) -> Iterator[str]:
+        '''
+        Split a line into IDs, quoted strings (quotes kept), edge operators and punctuation.
+
+        The end of the line is yielded as ``;``, it ends a statement outside of attribute lists.
+        A quoted string may continue on the next lines.
+        '''
+        if self.quoted_parts:
+            head, quote, line = _find_closing_quote(line)
+            self.quoted_parts.append(head)
+            if not quote:
+                return
+            yield '\n'.join(self.quoted_parts) + '"'
+            self.quoted_parts = []
+        else:
+            stripped = line.lstrip()
+            if not stripped or stripped[0] == '#' or stripped.startswith('//'):
+                return
+
+        while '"' in line:
+            unquoted, _, rest = line.partition('"')
+            yield from _split_unquoted(unquoted)
+            quoted, quote, line = _find_closing_quote(rest)
+            if not quote:
+                self.quoted_parts.append('"' + quoted)
+                return
+            yield f'"{quoted}"'
+
+        yield from _split_unquoted(line)
+        yield _END
+
+    def _feed(self, token: str) -> None:
+        if token == '[':
+            self.depth += 1
+        elif token == ']':
+            self.depth -= 1
+        elif self.depth:
+            pass
+        elif token == _END:
+            if self.graph is not None:
+                # otherwise the header may continue on the next line
+                self._apply(self.statement)
+                self.statement = []
+            return
+        elif token == '{':
+            self._open(self.statement)
+            self.statement = []
+            return
+        elif token == '}':
+            self._apply(self.statement)
+            self.statement = []
+            self._close()
+            return
+        self.statement.append(token)
+
+    def _open(self, header: list[str]) -> None:
+        if self.graph is not None:
+            raise ValueError('Subgraphs are not supported')
+        if header and header[0].lower() == 'strict':
+            header = header[1:]
+        if not header or header[0].lower() not in ('graph', 'digraph') or len(header) > 2:
+            raise ValueError(f'Bad DOT header: {" ".join(header)}')
+        label = _unquote(header[1]) if len(header) == 2 else 'G'
+        self.graph = Digraph(label) if header[0].lower() == 'digraph' else Graph(label)
+
+    def _close(self) -> None:
+        if self.graph is None or self.closed:
+            raise ValueError('Unexpected "}"')
+        self.closed = True
+
+    def _apply(self, statement: list[str]) -> None:
+        if not statement:
+            return
+        if self.graph is None or self.closed:
+            raise ValueError(f'Statement outside of a graph: {" ".join(statement)}')
+
+        try:
+            attributes_start = statement.index('[')
+        except ValueError:
+            attributes_start = len(statement)
+        ids = statement[:attributes_start]
+        attributes = _parse_attributes(statement[attributes_start:])
+
+        if not ids:
+            raise ValueError(f'Bad statement: {" ".join(statement)}')
+
+        first = ids[0]
+        if len(ids) == 1 and first in ('node', 'edge', 'graph'):
+            if first == 'node':
+                self.node_defaults.update(attributes)
+            elif first == 'edge':
+                self.edge_defaults.update(attributes)
+        elif len(ids) == 3 and ids[1] == '=':
+            pass  # graph attribute
+        elif len(ids) == 1:
+            self._add_vertex(first, attributes)
+        else:
+            self._add_edges(ids, attributes)
+
+    def _add_vertex(self, token: str, attributes: dict[str, str]):
+        name = _get_name(token)
+        vertex = self.graph.get_vertex(name, None)
+        if vertex is None:
+            vertex = self.graph.add_vertex(name)
+            if self.node_defaults:
+                vertex.update_dot_attributes(self.node_defaults)
+        if attributes:
+            vertex.update_dot_attributes(attributes)
+        return vertex
+
+    def _add_edges(self, ids: list[str], attributes: dict[str, str]) -> None:
+        expected_op = '->' if self.graph.directional else '--'
+        if len(ids) % 2 == 0 or any(op != expected_op for op in ids[1::2]):
+            raise ValueError(f'Bad edge statement: {" ".join(ids)}')
+
+        graph = self.graph
+        vertices = [self._add_vertex(token, {}).name for token in ids[::2]]
+        for v1, v2 in zip(vertices, vertices[1:]):
+            edge_count = graph.edge_count
+            edge = graph.add_edge(v1, v2)
+            if self.edge_defaults and graph.edge_count > edge_count:
+                edge.update_dot_attributes(self.edge_defaults)
+            if attributes:
+                edge.update_dot_attributes(attributes)
+
+
+def _split_unquoted(text: str) -> list[str]:
+    text = text.split('//', 1)[0]
+    for char in _PUNCTUATION:
+        if char in text:
+            text = text.replace(char, f' {char} ')
+    for op in _EDGE_OPS:
+        if op in text:
+            text = text.replace(op, f' {op} ')
+    return text.split()
+
+
+def _find_closing_quote(text: str) -> tuple[str, str, str]:
+    start = 0
+    while True:
+        end = text.find('"', start)
+        if end == -1:
+            return text.rstrip('\n'), '', ''
+        backslashes = len(text[start:end]) - len(text[start:end].rstrip('\\'))
+        if backslashes % 2 == 0:
+            return text[:end], '"', text[end + 1:]
+        start = end + 1
+
+
+def _parse_attributes(tokens: list[str]) -> dict[str, str]:
+    attributes = {}
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        if token in ('[', ']', ',', ';'):
+            i += 1
+        elif i + 2 < len(tokens) and tokens[i + 1] == '=':
+            attributes[_unquote(token)] = tokens[i + 2]
+            i += 3
+        else:
+            raise ValueError(f'Bad attribute list: {" ".join(tokens)}')
+    return attributes
+
+
+def _get_name(token: str) -> str:
+    if token[0] != '"':
+        # drop a port, if any
+        token = token.partition(':')[0]
+    return _unquote(token)
+
+
+def _unquote(token: str) -> str:
+    if len(token) > 1 and token[0] == '"' and token[-1] == '"':
+        return token[1:-1].replace('\\"', '"')
+    return token
@@ -0,0 +1,191 @@
+import heapq
+from typing import Optional
+
+import numpy as np
+
+from .edge import Edge
+from .graph import Graph
+from .graph_listener import GraphListener
+from .infinity import inf, InfNum
+from .matrix import get_floyd_array
+from .types import StrConvertable
+from .vertex import Vertex
+
+
+class DynamicDistances(GraphListener):
+    '''
+    Shortest path lengths between all vertices of a graph, kept up to date as the graph changes.
+
+    Attach it with ``DynamicDistances.attach(graph)``. Adding an edge relaxes the whole matrix
+    through the new edge in O(V^2). Removing an edge finds the sources whose shortest paths
+    could use it in O(V^2) and recomputes only their rows with BFS (Dijkstra for weighted graphs),
+    so it never costs more than computing all distances from scratch.
+    Eccentricities are kept along with the matrix, so radius, diameter and centers cost O(V).
+    With negative weights every edge change recomputes the whole matrix with Floyd-Warshall.
+    Call ``rebuild`` after changing edge weights in place.
+    '''
+
+    def __init__(self, graph: Graph) -> None:
+        self.graph = graph
+        self.rebuild()
+
+    @classmethod
+    def attach(cls, graph: Graph) -> 'DynamicDistances':
+        '''Get the structure attached to ``graph``, attach a new one if there is none.'''
+        distances = cls.get_attached(graph)
+        if distances is None:
+            distances = cls(graph)
+            graph.add_listener(distances)
+        return distances
+
+    @classmethod
+    def get_attached(cls, graph: Graph) -> Optional['DynamicDistances']:
+        for listener in graph.listeners:
+            if isinstance(listener, cls):
+                return listener
+        return None
+
+    def detach(self) -> None:
+        self.graph.remove_listener(self)
+
+    def rebuild(self) -> None:
+        self._names = [v.name for v in self.graph]
+        self._index = {name: i for i, name in enumerate(self._names)}
+        self._negative = any(_get_weight(edge) < 0 for edge in self.graph.edges)
+        self._distances = get_floyd_array(self.graph)
+        if not self._negative:
+            # a loop is not a shorter way to the vertex itself
+            np.fill_diagonal(self._distances, 0.0)
+        self._update_eccentricities()
+
+    def get_distance(self, v1: StrConvertable, v2: StrConvertable) -> InfNum:
+        return _to_inf_num(float(self._distances[self._index[str(v1)], self._index[str(v2)]]))
+
+    def get_eccentricities(self) -> list[InfNum]:
+        '''Eccentricities in the order of ``graph.vertices``.'''
+        eccentricities = self._eccentricities.tolist()
+        return [_to_inf_num(eccentricities[self._index[v.name]]) for v in self.graph]
+
+    @property
+    def radius(self) -> InfNum:
+        return _to_inf_num(float(self._eccentricities.min())) if len(self._names) else inf
+
+    @property
+    def diameter(self) -> InfNum:
+        return _to_inf_num(float(self._eccentricities.max())) if len(self._names) else inf
+
+    @property
+    def centers(self) -> set[str]:
+        if not self._names:
+            return set()
+        return {self._names[i] for i in np.flatnonzero(self._eccentricities == self._eccentricities.min())}
+
+    def on_vertex_added(self, graph: Graph, vertex: Vertex) -> None:
+        n = len(self._names)
+        distances = np.full((n + 1, n + 1), np.inf)
+        distances[:n, :n] = self._distances
+        distances[n, n] = 0.0
+        self._distances = distances
+        self._index[vertex.name] = n
+        self._names.append(vertex.name)
+        self._update_eccentricities()
+
+    def on_vertex_removed(self, graph: Graph, vertex: Vertex) -> None:
+        # the vertex has no edges by now, so no other distance changes
+        i = self._index[vertex.name]
+        self._distances = np.delete(np.delete(self._distances, i, axis=0), i, axis=1)
+        del self._names[i]
+        self._index = {name: j for j, name in enumerate(self._names)}
+        self._update_eccentricities()
+
+    def on_edge_added(self, graph: Graph, edge: Edge) -> None:
+        d = self._distances
+        u, v, w = self._index[edge.v1.name], self._index[edge.v2.name], _get_weight(edge)
+        if w < 0 or self._negative:
+            self.rebuild()
+            return
+        np.minimum(d, d[:, u, np.newaxis] + w + d[np.newaxis, v, :], out=d)
+        if not edge.directional:
+            np.minimum(d, d[:, v, np.newaxis] + w + d[np.newaxis, u, :], out=d)
+        self._update_eccentricities()
+
+    def on_edge_removed(self, graph: Graph, edge: Edge) -> None:
+        if self._negative:
+            self.rebuild()
+            return
+        d = self._distances
+        u, v, w = self._index[edge.v1.name], self._index[edge.v2.name], _get_weight(edge)
+        if u == v:
+            return
+
+        # sources with a shortest path to some vertex going through the edge
+        reachable = np.isfinite(d)
+        affected = (reachable & np.isclose(d[:, u, np.newaxis] + w + d[np.newaxis, v, :], d)).any(axis=1)
+        if not edge.directional:
+            affected |= (reachable & np.isclose(d[:, v, np.newaxis] + w + d[np.newaxis, u, :], d)).any(axis=1)
+
+        sources = np.flatnonzero(affected)
+        adjacency, weighted = self._get_adjacency()
+        search = self._dijkstra if weighted else self._bfs
+        for source in sources.tolist():
+            d[source] = search(adjacency, source)
+        if not edge.directional:
+            d[:, sources] = d[sources].T
+        self._update_eccentricities()
+
+    def _update_eccentricities(self) -> None:
+        self._eccentricities = self._distances.max(axis=1, initial=-np.inf)
+
+    def _get_adjacency(self) -> tuple[list[list[tuple[int, float]]], bool]:
+        adjacency = [[] for _ in self._names]
+        weighted = False
+        for edge in self.graph.edges:
+            u, v, w = self._index[edge.v1.name], self._index[edge.v2.name], _get_weight(edge)
+            weighted = weighted or w != 1
+            adjacency[u].append((v, w))
+            if not edge.directional:
+                adjacency[v].append((u, w))
+        return adjacency, weighted
+
+    @staticmethod
+    def _bfs(adjacency: list[list[tuple[int, float]]], source: int) -> list[float]:
+        row = [np.inf] * len(adjacency)
+        row[source] = 0
+        frontier = [source]
+        distance = 0
+        while frontier:
+            distance += 1
+            next_frontier = []
+            for v in frontier:
+                for u, _ in adjacency[v]:
+                    if row[u] == np.inf:
+                        row[u] = distance
+                        next_frontier.append(u)
+            frontier = next_frontier
+        return row
+
+    @staticmethod
+    def _dijkstra(adjacency: list[list[tuple[int, float]]], source: int) -> list[float]:
+        row = [np.inf] * len(adjacency)
+        done = [False] * len(adjacency)
+        heap = [(0.0, source)]
+        while heap:
+            distance, v = heapq.heappop(heap)
+            if done[v]:
+                continue
+            done[v] = True
+            row[v] = distance
+            for u, w in adjacency[v]:
+                if not done[u]:
+                    heapq.heappush(heap, (distance + w, u))
+        return row
+
+
+def _get_weight(edge: Edge) -> float:
+    return 1.0 if edge.weight is None else edge.weight
+
+
+def _to_inf_num(value: float) -> InfNum:
+    if value == np.inf:
+        return inf
+    return int(value) if value.is_integer() else value
@@ -1,20 +1,24 @@
 from dataclasses import dataclass, field
 from typing import Optional, Dict
 
-from .vertex import Vertex
+from .vertex import Vertex, quote_dot_id
 from .dot_attributes_mixin import DotAttributesMixin
 
 
-@dataclass
+@dataclass(slots=True)
 class Edge(DotAttributesMixin):
     v1: Vertex
     v2: Vertex
     directional: bool = False
     weight: Optional[float] = None
 
+    def __post_init__(self):
+        self._dot_attributes = None
+
     @property
     def dot(self):
+        return self._get_dot(self._get_attributes_string())
+
+    def _get_dot(self, attributes: str) -> str:
         arrow = '->' if self.directional else '--'
-        attributes = self._get_attributes_string()
-        dot = f'{self.v1.name} {arrow} {self.v2.name} {attributes}'
-        return dot
+        return f'{quote_dot_id(self.v1.name)} {arrow} {quote_dot_id(self.v2.name)} {attributes}'
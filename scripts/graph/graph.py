@@ -1,7 +1,9 @@
 from copy import deepcopy
-from typing import Any, Optional
+from typing import Any, Iterable, Iterator, Optional, TextIO, Union
 
 from .edge import Edge
+from .graph_listener import GraphListener
+from .layered_dict import LayeredDict
 from .missing import MISSING
 from .types import StrConvertable
 from .vertex import Vertex
@@ -15,11 +17,18 @@ class Graph:
     '''
 
     _dot_name = 'graph'
+    _storage = ('_vertices', '_edges', '_successors', '_predecessors')
+    directional = False
 
     def __init__(self, label: str = 'G'):
         self._label = label
         self._vertices: dict[str, Vertex] = {}
         self._edges: dict[tuple[str, str], Edge] = {}
+        # incidence index: vertex name -> {adjacent vertex name: edge}
+        self._successors: dict[str, dict[str, Edge]] = {}
+        self._predecessors: dict[str, dict[str, Edge]] = {}
+        self._version = 0
+        self._listeners: list[GraphListener] = []
 
     def __len__(self):
         return len(self._vertices)
@@ -27,6 +36,16 @@ class Graph:
     def __iter__(self):
         return iter(self._vertices.values())
 
+    def __getstate__(self) -> dict[str, Any]:
+        # listeners belong to this graph only, copies and pickles do not get them
+        state = self.__dict__.copy()
+        del state['_listeners']
+        return state
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._listeners = []
+
     def __repr__(self):
         return f'<{self.__class__.__name__} {repr(set(self._vertices.keys()))}, {repr(set(self._edges.keys()))}>'
 
@@ -34,6 +53,16 @@ class Graph:
     def label(self) -> str:
         return self._label
 
+    @property
+    def version(self) -> int:
+        '''
+        A counter that changes every time vertices or edges are added or removed.
+
+        Lets algorithms cache results per graph state.
+        Changing an existing edge or vertex in place does not change the version.
+        '''
+        return self._version
+
     @property
     def vertices(self) -> tuple[Vertex, ...]:
         return tuple(self._vertices.values())
@@ -42,6 +71,21 @@ class Graph:
     def edges(self) -> tuple[Edge]:
         return tuple(self._edges.values())
 
+    @property
+    def edge_count(self) -> int:
+        return len(self._edges)
+
+    @property
+    def listeners(self) -> tuple[GraphListener, ...]:
+        return tuple(self._listeners)
+
+    def add_listener(self, listener: GraphListener) -> None:
+        '''Notify ``listener`` of every vertex and edge added to or removed from the graph.'''
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: GraphListener) -> None:
+        self._listeners.remove(listener)
+
     def get_vertex(self, vertex_name: StrConvertable, default: Any = MISSING) -> Vertex:
         vertex_name = str(vertex_name)
         v = self._vertices.get(vertex_name, default)
@@ -56,14 +100,51 @@ class Graph:
             return existing
         vertex = Vertex(name)
         self._vertices[name] = vertex
+        self._successors[name] = {}
+        self._predecessors[name] = {}
+        self._version += 1
+        for listener in self._listeners:
+            listener.on_vertex_added(self, vertex)
         return vertex
 
     def remove_vertex(self, name: StrConvertable) -> None:
+        '''
+        Remove vertex ``name``.
+
+        All edges connected to the vertex are removed as well.
+        '''
         name = str(name)
         exists = self._vertices.get(name, MISSING)
         if exists is MISSING:
             return
-        del self._vertices[name]
+        for edge in self._get_incident_edges(name):
+            self._unlink_edge(edge)
+        self._delete_vertex(name)
+
+    def neighbors(self, vertex: StrConvertable) -> list[Vertex]:
+        '''
+        Get all vertices connected to ``vertex`` by an edge in any direction.
+
+        Runs in O(degree) using the incidence index.
+        '''
+        name = str(vertex)
+        self.get_vertex(name)
+        neighbors = [edge.v2 for edge in self._successors[name].values()]
+        neighbors.extend(edge.v1 for v, edge in self._predecessors[name].items() if v != name)
+        return neighbors
+
+    def successors(self, vertex: StrConvertable) -> list[Vertex]:
+        '''Get vertices reachable from ``vertex`` by one edge. Same as ``neighbors`` for a non-directional graph.'''
+        return self.neighbors(vertex)
+
+    def predecessors(self, vertex: StrConvertable) -> list[Vertex]:
+        '''Get vertices ``vertex`` is reachable from by one edge. Same as ``neighbors`` for a non-directional graph.'''
+        return self.neighbors(vertex)
+
+    def get_out_edges(self, vertex: StrConvertable) -> list[Edge]:
+        '''Get edges that can be followed from ``vertex``. For a non-directional graph these are all edges of the vertex.'''
+        name = self.get_vertex(vertex).name
+        return self._get_incident_edges(name)
 
     def get_edge(self, v1: StrConvertable, v2: StrConvertable, default: Any = MISSING) -> Edge:
         key = self._get_edge_key(v1, v2)
@@ -75,24 +156,24 @@ class Graph:
         else:
             return default
 
-    def add_edge(self, v1: StrConvertable, v2: StrConvertable) -> Edge:
+    def add_edge(self, v1: StrConvertable, v2: StrConvertable, weight: Optional[float] = None) -> Edge:
+        '''
+        Add edge (v1, v2), adding its vertices if needed.
+
+        Returns the existing edge unchanged if there is one.
+        '''
         v1, v2 = self.add_vertex(v1), self.add_vertex(v2)
         key = (v1.name, v2.name)
         existing = self.get_edge(*key, default=None)
         if existing:
             return existing
-        edge = Edge(v1, v2)
-        self._edges[key] = edge
+        edge = Edge(v1, v2, self.directional, weight)
+        self._link_edge(edge)
         return edge
 
     def remove_edge(self, v1: StrConvertable, v2: StrConvertable) -> None:
-        key = self._get_edge_key(v1, v2)
-        exists = self.get_edge(*key)
-
-        if exists is MISSING:
-            raise RuntimeError(f'Could not find edge {key} in {self.dot}')
-
-        del self._edges[key]
+        edge = self.get_edge(v1, v2)
+        self._unlink_edge(edge)
 
     def merge_edge(self, v1: str, v2: str) -> None:
         '''
@@ -100,43 +181,168 @@ class Graph:
 
         Removes (l, r) edge and ``r`` vertex.
         All edges connected to ``r`` are reconnected to ``l``.
+        Runs in O(degree of r).
         '''
         merge_edge = self.get_edge(v1, v2, default=None)
         if not merge_edge:
             return
-        v1, v2 = merge_edge.v1, merge_edge.v2
+        self._contract(merge_edge)
+
+    def contract_many(self, pairs: Iterable[tuple[StrConvertable, StrConvertable]]) -> dict[str, str]:
+        '''
+        Merge many edges in one go, as ``merge_edge`` does for each pair in order.
+
+        A pair may name vertices already merged by earlier pairs, they are replaced
+        with the vertices they were merged into. Pairs that are not edges by then are skipped.
+
+        :return: A mapping of every removed vertex name to the name of the vertex it was merged into.
+        '''
+        merged_into: dict[str, str] = {}
 
-        for edge in self.edges:
-            if edge == merge_edge:
+        def find(name: str) -> str:
+            root = name
+            while root in merged_into:
+                root = merged_into[root]
+            while name != root:
+                merged_into[name], name = root, merged_into[name]
+            return root
+
+        for v1, v2 in pairs:
+            v1, v2 = find(str(v1)), find(str(v2))
+            if v1 == v2:
+                continue
+            edge = self.get_edge(v1, v2, default=None)
+            if not edge:
                 continue
-            if edge.v1 == v2:
-                edge.v1 = v1
-                self.remove_edge(v2.name, edge.v2.name)
-                self.add_edge(v1.name, edge.v2.name)
-            if edge.v2 == v2:
-                self.remove_edge(edge.v1.name, v2.name)
-                self.add_edge(edge.v1.name, v1.name)
+            merged_into[edge.v2.name] = edge.v1.name
+            self._contract(edge)
+
+        return {name: find(name) for name in merged_into}
+
+    def copy(self, lazy: bool = False) -> 'Graph':
+        '''
+        Copy the graph.
+
+        A deep copy by default. A lazy copy costs O(1): this graph and the copy share the current
+        storage and each records only its own added and removed vertices and edges on top of it.
+        Vertex and Edge objects are shared as well, so changing their attributes or weights
+        shows in both graphs. Call ``materialize`` on a lazy copy to make it standalone.
+        '''
+        if not lazy:
+            return deepcopy(self)
 
-        self.remove_edge(v1.name, v2.name)
-        self.remove_vertex(v2.name)
+        copy = self.__class__.__new__(self.__class__)
+        copy.__setstate__(self.__getstate__())
+        for name in self._storage:
+            base = LayeredDict.fork(getattr(self, name))
+            setattr(self, name, LayeredDict(base))
+            setattr(copy, name, LayeredDict(base))
+        return copy
 
-    def copy(self) -> 'Graph':
-        return deepcopy(self)
+    def materialize(self) -> 'Graph':
+        '''Give the graph its own storage and its own copies of vertices and edges.'''
+        self.__dict__.update(deepcopy(self.__getstate__()))
+        return self
 
     @property
-    def dot(self):
-        name = self._dot_name
-        dot = f'{name} {self.label} {{\n'
+    def dot(self) -> str:
+        return ''.join(self._iter_dot())
+
+    def write_dot(self, file: TextIO, chunk_size: int = 4096) -> None:
+        '''
+        Write ``dot`` to ``file`` without building the whole document in memory.
+
+        :param chunk_size: Number of lines joined into a single ``file.write`` call.
+        '''
+        chunk = []
+        for line in self._iter_dot():
+            chunk.append(line)
+            if len(chunk) >= chunk_size:
+                file.write(''.join(chunk))
+                chunk.clear()
+        file.write(''.join(chunk))
+
+    def _iter_dot(self) -> Iterator[str]:
+        # every element has its own attributes dict, but most of them hold the same few attribute sets
+        attribute_strings: dict[tuple[tuple[str, str], ...], str] = {}
+
+        def get_dot(element: Union[Vertex, Edge]) -> str:
+            attributes = element.dot_attributes
+            if not attributes:
+                return element._get_dot('')
+            key = tuple(attributes.items())
+            string = attribute_strings.get(key)
+            if string is None:
+                string = attribute_strings[key] = element._get_attributes_string()
+            return element._get_dot(string)
+
+        yield f'{self._dot_name} {self.label} {{\n'
+        for vertex in self._vertices.values():
+            yield f'    {get_dot(vertex)}\n'
+        for edge in self._edges.values():
+            yield f'    {get_dot(edge)}\n'
+        yield '}'
+
+    def _contract(self, merge_edge: Edge) -> None:
+        keep, drop = merge_edge.v1, merge_edge.v2
+        self._unlink_edge(merge_edge)
+        if keep.name == drop.name:
+            return
+
+        for edge in self._get_incident_edges(drop.name):
+            self._unlink_edge(edge)
+            v1 = keep if edge.v1.name == drop.name else edge.v1
+            v2 = keep if edge.v2.name == drop.name else edge.v2
+            if v1.name == v2.name or self._get_edge_key(v1.name, v2.name):
+                # became a loop or a duplicate of an existing edge
+                continue
+            # edges may be shared with lazy copies, build a new one
+            moved = Edge(v1, v2, edge.directional, edge.weight)
+            if edge.dot_attributes is not None:
+                moved.set_dot_attributes(dict(edge.dot_attributes))
+            self._link_edge(moved)
+
+        self._delete_vertex(drop.name)
+
+    def _delete_vertex(self, name: str) -> None:
+        vertex = self._vertices.pop(name)
+        del self._successors[name]
+        del self._predecessors[name]
+        self._version += 1
+        for listener in self._listeners:
+            listener.on_vertex_removed(self, vertex)
+
+    def _get_incident_edges(self, name: str) -> list[Edge]:
+        edges = list(self._successors[name].values())
+        edges.extend(edge for v, edge in self._predecessors[name].items() if v != name)
+        return edges
 
-        for vertex in self.vertices:
-            dot += f'    {vertex.dot}\n'
+    def _link_edge(self, edge: Edge) -> None:
+        v1, v2 = edge.v1.name, edge.v2.name
+        self._edges[(v1, v2)] = edge
+        self._get_own_incident(self._successors, v1)[v2] = edge
+        self._get_own_incident(self._predecessors, v2)[v1] = edge
+        self._version += 1
+        for listener in self._listeners:
+            listener.on_edge_added(self, edge)
 
-        for edge in self.edges:
-            dot += f'    {edge.dot}\n'
-        
-        dot += '}'
+    def _unlink_edge(self, edge: Edge) -> None:
+        v1, v2 = edge.v1.name, edge.v2.name
+        del self._edges[(v1, v2)]
+        del self._get_own_incident(self._successors, v1)[v2]
+        del self._get_own_incident(self._predecessors, v2)[v1]
+        self._version += 1
+        for listener in self._listeners:
+            listener.on_edge_removed(self, edge)
 
-        return dot
+    @staticmethod
+    def _get_own_incident(index: dict[str, dict[str, Edge]], name: str) -> dict[str, Edge]:
+        # an incident edges dict coming from the base of a lazy copy is shared, copy it before a change
+        incident = index[name]
+        if isinstance(index, LayeredDict) and not index.owns(name):
+            incident = dict(incident)
+            index[name] = incident
+        return incident
 
     def _get_edge_key(self, v1: StrConvertable, v2: StrConvertable) -> Optional[tuple[str, str]]:
         v1, v2 = str(v1), str(v2)
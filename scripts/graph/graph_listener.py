@@ -0,0 +1,28 @@
+from typing import TYPE_CHECKING
+
+from .edge import Edge
+from .vertex import Vertex
+
+if TYPE_CHECKING:
+    from .graph import Graph
+
+
+class GraphListener:
+    '''
+    Gets notified of changes of the graphs it is added to with ``Graph.add_listener``.
+
+    Every method is called right after the change. Removing a vertex removes its edges first,
+    so a removed vertex never has edges. Changing vertices or edges in place is not reported.
+    '''
+
+    def on_vertex_added(self, graph: 'Graph', vertex: Vertex) -> None:
+        pass
+
+    def on_vertex_removed(self, graph: 'Graph', vertex: Vertex) -> None:
+        pass
+
+    def on_edge_added(self, graph: 'Graph', edge: Edge) -> None:
+        pass
+
+    def on_edge_removed(self, graph: 'Graph', edge: Edge) -> None:
+        pass
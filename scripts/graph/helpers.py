@@ -1,9 +1,14 @@
-from typing import Any, List, Set, Iterable
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, List, Set, Iterable, Optional, Union
 
-from dot2tex import dot2tex
+from dot2tex import __version__ as dot2tex_version, dot2tex
 
 from .graph import Graph
 from .infinity import inf, InfNum
+from .missing import MISSING
+from .render_cache import RenderCache
 from .types import StrConvertable
 
 
@@ -20,5 +25,77 @@ def get_vertices_names(graph: Graph) -> List[str]:
     return [v.name for v in graph.vertices]
 
 
-def get_latex_tikz_string(graph: Graph):
-    return dot2tex(graph.dot, figonly=True, usepdflatex=True, format='tikz')
+_TIKZ_OPTIONS = {'figonly': True, 'usepdflatex': True, 'format': 'tikz'}
+
+tikz_cache = RenderCache(Path(os.environ.get('XDG_CACHE_HOME', Path.home() / '.cache')) / 'graph-tikz')
+
+
+def get_latex_tikz_string(graph: Union[Graph, str], cache: Optional[RenderCache] = MISSING):
+    '''
+    Render ``graph`` (or its DOT source) to TikZ with dot2tex.
+
+    Renders are cached by the hash of the DOT source and dot2tex options,
+    so an unchanged figure never runs Graphviz again.
+
+    :param cache: Cache to use, ``tikz_cache`` by default. None disables caching.
+    '''
+    dot = graph if isinstance(graph, str) else graph.dot
+    cache = tikz_cache if cache is MISSING else cache
+    if cache is None:
+        return _render_tikz(dot)
+
+    key = _get_tikz_key(dot)
+    tikz = cache.get(key)
+    if tikz is None:
+        tikz = cache[key] = _render_tikz(dot)
+    return tikz
+
+
+def get_latex_tikz_strings(
+    graphs: Iterable[Union[Graph, str]],
+    workers: Optional[int] = None,
+    cache: Optional[RenderCache] = MISSING,
+    render: Callable[[str], str] = MISSING,
+) -> list[str]:
+    '''
+    Render many graphs (or DOT sources) to TikZ at once, results are in the order of ``graphs``.
+
+    DOT is taken from every graph before anything is rendered, so a graph may be changed
+    and passed again. Cached and repeated figures are rendered once, the rest in a process pool.
+
+    :param workers: Size of the process pool, ``os.cpu_count()`` by default. With 1 renders in the current process.
+    :param cache: Cache to use, ``tikz_cache`` by default. None disables caching.
+    :param render: Function rendering DOT to TikZ, dot2tex with the TikZ options by default.
+        It is sent to the pool workers, so it has to be a picklable module level function.
+        Its results are cached under the same keys as the dot2tex ones, use a separate cache for it.
+    '''
+    render = _render_tikz if render is MISSING else render
+    dots = [graph if isinstance(graph, str) else graph.dot for graph in graphs]
+    cache = tikz_cache if cache is MISSING else cache
+
+    rendered: dict[str, str] = {}
+    if cache is not None:
+        for dot in dots:
+            tikz = cache.get(_get_tikz_key(dot))
+            if tikz is not None:
+                rendered[dot] = tikz
+
+    missing = list(dict.fromkeys(dot for dot in dots if dot not in rendered))
+    if len(missing) < 2 or workers == 1:
+        rendered.update(zip(missing, map(render, missing)))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            rendered.update(zip(missing, executor.map(render, missing)))
+
+    if cache is not None:
+        for dot in missing:
+            cache[_get_tikz_key(dot)] = rendered[dot]
+    return [rendered[dot] for dot in dots]
+
+
+def _get_tikz_key(dot: str) -> str:
+    return RenderCache.make_key(dot, {**_TIKZ_OPTIONS, 'dot2tex': dot2tex_version})
+
+
+def _render_tikz(dot: str) -> str:
+    return dot2tex(dot, **_TIKZ_OPTIONS)
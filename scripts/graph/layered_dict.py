@@ -0,0 +1,114 @@
+from collections.abc import ItemsView, KeysView, Mapping, MutableMapping, ValuesView
+from copy import deepcopy
+from typing import Any, Hashable, Iterator
+
+from .missing import MISSING
+
+
+class LayeredDict(MutableMapping):
+    '''
+    A dict that records changes on top of a shared base mapping without touching it.
+
+    Lookups go through the own changes first and then to the base.
+    The base must not be changed while layers over it are alive.
+    Iteration flattens the layers into a plain dict first. The order is the one of a plain dict:
+    new keys and keys removed and set again come after the base ones, in the order they were set.
+    '''
+
+    max_depth = 32
+
+    def __init__(self, base: Mapping) -> None:
+        if isinstance(base, LayeredDict) and base.depth >= self.max_depth:
+            base = base.to_dict()
+        self._base = base
+        self._added: dict[Hashable, Any] = {}
+        self._removed: set[Hashable] = set()
+        # base keys removed and then set again, they move to the end
+        self._moved: set[Hashable] = set()
+        self._len = len(base)
+        self.depth = base.depth + 1 if isinstance(base, LayeredDict) else 1
+
+    @classmethod
+    def fork(cls, storage: Mapping) -> Mapping:
+        '''Get a base for new layers over ``storage``, skipping layers that have no changes.'''
+        while isinstance(storage, LayeredDict) and not storage._added and not storage._removed:
+            storage = storage._base
+        return storage
+
+    def to_dict(self) -> dict:
+        '''Get a plain dict with the same items, applying the layers from the bottom up.'''
+        layers = []
+        mapping = self
+        while isinstance(mapping, LayeredDict):
+            layers.append(mapping)
+            mapping = mapping._base
+        result = dict(mapping)
+        for layer in reversed(layers):
+            for key in layer._removed:
+                del result[key]
+            for key in layer._moved:
+                del result[key]
+            result.update(layer._added)
+        return result
+
+    def owns(self, key: Hashable) -> bool:
+        '''Whether the value for ``key`` was set on this layer and is not shared with the base.'''
+        return key in self._added
+
+    def __getitem__(self, key: Hashable) -> Any:
+        value = self._added.get(key, MISSING)
+        if value is not MISSING:
+            return value
+        if key in self._removed:
+            raise KeyError(key)
+        return self._base[key]
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        value = self._added.get(key, MISSING)
+        if value is not MISSING:
+            return value
+        if key in self._removed:
+            return default
+        return self._base.get(key, default)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._added or (key not in self._removed and key in self._base)
+
+    def __setitem__(self, key: Hashable, value: Any) -> None:
+        if key not in self:
+            self._len += 1
+        self._added[key] = value
+        if key in self._removed:
+            self._removed.remove(key)
+            self._moved.add(key)
+
+    def __delitem__(self, key: Hashable) -> None:
+        if key not in self:
+            raise KeyError(key)
+        self._added.pop(key, None)
+        self._moved.discard(key)
+        if key in self._base:
+            self._removed.add(key)
+        self._len -= 1
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(self.to_dict())
+
+    def keys(self) -> KeysView:
+        return self.to_dict().keys()
+
+    def values(self) -> ValuesView:
+        return self.to_dict().values()
+
+    def items(self) -> ItemsView:
+        return self.to_dict().items()
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({self.to_dict()!r})'
+
+    def __deepcopy__(self, memo: dict) -> dict:
+        # a deep copy does not need the shared base, flatten it
+        return deepcopy(self.to_dict(), memo)
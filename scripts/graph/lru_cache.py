@@ -0,0 +1,46 @@
+from collections import OrderedDict
+from typing import Any, Hashable
+
+from .missing import MISSING
+
+
+class LRUCache:
+    '''
+    A mapping with bounded size.
+
+    When the cache is full, adding a new key evicts the least recently used one.
+    '''
+
+    def __init__(self, maxsize: int = 1024) -> None:
+        self.maxsize = maxsize
+        self._data: OrderedDict[Hashable, Any] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+    def __getitem__(self, key: Hashable) -> Any:
+        value = self._data[key]
+        self._data.move_to_end(key)
+        return value
+
+    def __setitem__(self, key: Hashable, value: Any) -> None:
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        value = self._data.get(key, MISSING)
+        if value is MISSING:
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        return self._data.pop(key, default)
+
+    def clear(self) -> None:
+        self._data.clear()
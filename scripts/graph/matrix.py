@@ -0,0 +1,60 @@
+import numpy as np
+
+from .compact_graph import AnyGraph, as_compact_graph
+
+
+def get_adjacency_array(graph: AnyGraph, no_path: float = np.inf, self_cross: float = 0.0) -> np.ndarray:
+    '''
+    Get a graph adjacency matrix as a float64 array.
+
+    Rows and columns follow the order of ``graph.vertices``.
+
+    :param graph: Target graph.
+    :param no_path: A value to be put in matrix if there is no edge connecting vertices.
+    :param self_cross: A value to be put in matrix for self-crossing vertices (if there is no cycle edge).
+
+    :return: Target graph adjacency matrix.
+    '''
+    compact = as_compact_graph(graph)
+    n = len(compact)
+
+    adjacency = np.full((n, n), no_path, dtype=np.float64)
+    np.fill_diagonal(adjacency, self_cross)
+
+    offsets = np.asarray(compact.offsets, dtype=np.intp)
+    rows = np.repeat(np.arange(n), np.diff(offsets))
+    cols = np.asarray(compact.targets, dtype=np.intp)
+    adjacency[rows, cols] = 1 if compact.weights is None else np.asarray(compact.weights, dtype=np.float64)
+
+    return adjacency
+
+
+def get_floyd_array(graph: AnyGraph) -> np.ndarray:
+    '''
+    Get a matrix of shortest path lengths between all vertices (Floyd-Warshall).
+
+    Each pivot ``k`` is applied to the whole matrix with a single broadcasted ``np.minimum``.
+    Missing paths are ``np.inf``. With negative weights the matrix is updated in place
+    element by element, so negative cycles give the same values as the classic triple loop.
+    '''
+    d = get_adjacency_array(graph, np.inf, 0.0)
+    if (d < 0).any():
+        return _get_floyd_array_in_place(d)
+
+    for k in range(len(d)):
+        np.minimum(d, d[:, k, np.newaxis] + d[np.newaxis, k, :], out=d)
+
+    return d
+
+
+def _get_floyd_array_in_place(d: np.ndarray) -> np.ndarray:
+    # a pivot with a negative cycle through it changes its own row and column while it is applied
+    n = len(d)
+    rows = d.tolist()
+    for k in range(n):
+        row_k = rows[k]
+        for j in range(n):
+            for i in range(n):
+                row = rows[i]
+                row[j] = min(row[j], row[k] + row_k[j])
+    return np.array(rows, dtype=np.float64).reshape(n, n)
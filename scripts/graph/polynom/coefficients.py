@@ -0,0 +1,91 @@
+'''
+Arithmetic on polynomials in one variable stored as coefficient lists.
+
+``p[i]`` is the coefficient of ``x^i``. Coefficients are Python ints, so results stay exact
+for any degree (int64 arrays overflow on chromatic polynomials of ~20 vertices).
+'''
+from typing import Sequence
+
+import numpy as np
+
+
+Coefficients = list[int]
+
+
+def trim(p: Sequence[int]) -> Coefficients:
+    p = list(p)
+    while p and p[-1] == 0:
+        p.pop()
+    return p
+
+
+def add(p: Sequence[int], q: Sequence[int]) -> Coefficients:
+    if len(p) < len(q):
+        p, q = q, p
+    result = list(p)
+    for i, c in enumerate(q):
+        result[i] += c
+    return trim(result)
+
+
+def sub(p: Sequence[int], q: Sequence[int]) -> Coefficients:
+    return add(p, [-c for c in q])
+
+
+def mul(p: Sequence[int], q: Sequence[int]) -> Coefficients:
+    if not p or not q:
+        return []
+    result = [0] * (len(p) + len(q) - 1)
+    for i, a in enumerate(p):
+        if not a:
+            continue
+        for j, b in enumerate(q):
+            result[i + j] += a * b
+    return trim(result)
+
+
+def power(p: Sequence[int], n: int) -> Coefficients:
+    result = [1]
+    base = list(p)
+    while n:
+        if n & 1:
+            result = mul(result, base)
+        n >>= 1
+        if n:
+            base = mul(base, base)
+    return result
+
+
+def monomial(n: int, multiplier: int = 1) -> Coefficients:
+    '''``multiplier * x^n``.'''
+    return [0] * n + [multiplier]
+
+
+def falling_factorial(n: int) -> Coefficients:
+    '''``x(x-1)...(x-n+1)``.'''
+    result = [1]
+    for i in range(n):
+        result = mul(result, [-i, 1])
+    return result
+
+
+def evaluate(p: Sequence[int], x: int) -> int:
+    '''Evaluate ``p`` at ``x`` with Horner's scheme.'''
+    result = 0
+    for c in reversed(p):
+        result = result * x + c
+    return result
+
+
+def evaluate_many(p: Sequence[int], xs: Sequence[int], exact: bool = False) -> np.ndarray:
+    '''
+    Evaluate ``p`` at every point of ``xs`` at once with Horner's scheme.
+
+    :param exact: Compute with Python ints in an object array. Otherwise ``float64`` is used,
+        which is fast but loses precision once values exceed 2^53.
+    '''
+    xs = np.asarray(xs, dtype=object if exact else np.float64)
+    result = np.zeros(xs.shape, dtype=xs.dtype)
+    for c in reversed(p):
+        result = result * xs + c
+    return result
@@ -1,6 +1,9 @@
-import re
 from dataclasses import dataclass, field
-from typing import Any, Optional, TypeVar
+from typing import Any, Mapping, Optional, Sequence, TypeVar, Union
+
+import numpy as np
+
+from . import coefficients
 
 
 @dataclass
@@ -8,7 +11,13 @@ class Var:
     name: str = field(hash=True)
 
 
+# (variable name or None for a constant, power)
+TermKey = tuple[Optional[str], float]
+
+
 class PolyToken:
+    __slots__ = ('var', 'multiplier', 'power')
+
     def __init__(self, var: Optional[str | Var] = None, multiplier: float = 1.0, power: float = 1.0):
 
         if isinstance(var, Var):
@@ -21,108 +30,179 @@ class PolyToken:
         self.multiplier = multiplier
         self.power = power
 
+    @property
+    def key(self) -> TermKey:
+        return None if self.var is None else self.var.name, self.power
+
     def swap_sign(self):
         self.multiplier = -self.multiplier
         return self
 
     def __str__(self):
-        multiplier = self.multiplier
-
-        if multiplier == 1:
-            multiplier = ''
-        # elif multiplier == -1:
-        #     multiplier_string = '-'
-        else:
-            multiplier = f'({multiplier})'
-
-        var = '' if self.var is None else self.var.name
-        times = ' * ' if multiplier else ''
-        power = self.power if self.power != 1 else ''
-        to = '^{' if power else ''
-        end = '}' if power else ''
+        return _format_term(self.key, self.multiplier)
 
-        return f'{multiplier}{times}{var}{to}{power}{end}'
+    def __mul__(self, other: float) -> 'PolyToken':
+        return PolyToken(self.var, self.multiplier * other, self.power)
 
-    def __mul__(self, other: float):
+    def __imul__(self, other: float) -> 'PolyToken':
         self.multiplier *= other
+        return self
 
     def __repr__(self):
         return f'<{self.__class__.__name__} {str(self)}>'
 
     def __hash__(self):
-        return hash(repr(self))
+        return hash((self.key, self.multiplier))
 
 
-_TPolynom = TypeVar(name='_TPolynom', bound='Polynom')
+_TPolynom = TypeVar(name='_TPolynom', bound='_BasePolynom')
 _OtherPolynom = str | int | float | Var | PolyToken | _TPolynom
 
 
-class Polynom:
-    def __init__(self) -> None:
-        self._tokens = []
+class _BasePolynom:
+    '''
+    A sum of terms ``multiplier * var^power``.
+
+    Terms are kept in a ``{(var, power): multiplier}`` dict in the order they first appeared.
+    Terms that cancel out stay with multiplier 0. ``+``, ``-`` and ``*`` return new polynoms
+    of the type of the left operand.
+    '''
+
+    __slots__ = ('_terms', '_string')
+
+    def __init__(self, *tokens: _OtherPolynom) -> None:
+        terms: dict[TermKey, float] = {}
+        for t in tokens:
+            _add_terms(terms, self._resolve_other('__add__', t), 1)
+        self._terms = terms
+        self._string: Optional[str] = None
 
     @classmethod
     def from_tokens(cls, *tokens: _OtherPolynom) -> _TPolynom:
-        obj = cls()
-        for t in tokens:
-            obj += t
-        return obj
+        return cls(*tokens)
 
-    def swap_sign(self):
-        for token in self._tokens:
-            token.swap_sign()
-        return self
+    @classmethod
+    def _from_terms(cls, terms: dict[TermKey, float]) -> _TPolynom:
+        p = cls.__new__(cls)
+        p._terms = terms
+        p._string = None
+        return p
+
+    @property
+    def tokens(self) -> list[PolyToken]:
+        return [PolyToken(var, multiplier, power) for (var, power), multiplier in self._terms.items()]
+
+    @classmethod
+    def from_coefficients(cls, multipliers: Sequence[float], var: str | Var = 'x') -> _TPolynom:
+        '''Build ``m[n] * var^n + ... + m[1] * var + m[0]`` from multipliers ``m`` in ascending powers.'''
+        var = var.name if isinstance(var, Var) else var
+        terms = {}
+        for power in reversed(range(len(multipliers))):
+            if multipliers[power]:
+                terms[(var, power) if power else (None, 1.0)] = multipliers[power]
+        return cls._from_terms(terms)
+
+    def evaluate(self, x: Union[float, Sequence[float], np.ndarray, Mapping[str, float]], exact: bool = False) -> Any:
+        '''
+        Evaluate the polynom.
+
+        A polynom in a single variable with whole non-negative powers is evaluated with Horner's scheme,
+        an array of points is evaluated at once (see ``coefficients.evaluate_many``).
+        Other polynoms are evaluated term by term.
+
+        :param x: Value of every variable, an array of values or a mapping from variable names to values.
+        :param exact: Compute with Python ints, whole multipliers are converted to ints.
+        '''
+        if isinstance(x, (np.ndarray, Sequence)):
+            x = np.asarray(x, dtype=object if exact else np.float64)
+
+        dense = self._get_dense_coefficients()
+        if dense is None or isinstance(x, Mapping):
+            result = 0
+            for (var, power), multiplier in self._terms.items():
+                if var is None:
+                    result += multiplier
+                else:
+                    result += multiplier * (x[var] if isinstance(x, Mapping) else x) ** power
+            return result
+
+        if exact:
+            dense = [int(c) if float(c).is_integer() else c for c in dense]
+        if isinstance(x, np.ndarray):
+            return coefficients.evaluate_many(dense, x, exact)
+        return coefficients.evaluate(dense, x)
+
+    def _get_dense_coefficients(self) -> Optional[list[float]]:
+        '''Coefficients in ascending powers, None unless the polynom is in one variable with whole non-negative powers.'''
+        if len({var for var, _ in self._terms if var is not None}) > 1:
+            return None
+
+        powers = [0 if var is None else power for var, power in self._terms]
+        if any(power < 0 or power != int(power) for power in powers):
+            return None
+
+        dense = [0] * (int(max(powers, default=0)) + 1)
+        for power, multiplier in zip(powers, self._terms.values()):
+            dense[int(power)] += multiplier
+        return dense
 
     def __str__(self) -> str:
-        self._tokens = sorted(self._tokens, key=lambda t: t.power, reverse=True)
-        string = ' + '.join(str(token) for token in self._tokens)
-        return string
+        if self._string is None:
+            # stable, so terms of the same power keep their order
+            terms = sorted(self._terms.items(), key=lambda item: item[0][1], reverse=True)
+            self._string = ' + '.join(_format_term(key, multiplier) for key, multiplier in terms)
+        return self._string
 
     def __repr__(self) -> str:
         return f'<{self.__class__.__name__} {str(self)}>'
 
     def __neg__(self) -> _TPolynom:
-        p = Polynom()
-        for token in self._tokens:
-            p += token.swap_sign()
-        return p
+        return self._from_terms({key: -multiplier for key, multiplier in self._terms.items()})
 
     def __pos__(self) -> _TPolynom:
         return self
 
     def __add__(self, other: _OtherPolynom) -> _TPolynom:
-        other = self._resolve_other('__add__', other)
-
-        if isinstance(other, PolyToken):
-            self._add_token(other)
-        elif isinstance(other, Polynom):
-            for t in other._tokens:
-                self._add_token(t)
-
-        return self
+        terms = self._terms.copy()
+        _add_terms(terms, self._resolve_other('__add__', other), 1)
+        return self._from_terms(terms)
 
     def __radd__(self, other: _OtherPolynom) -> _TPolynom:
         return self + other
 
-    def __iadd__(self, other: _OtherPolynom) -> _TPolynom:
-        return self + other
-
     def __sub__(self, other: _OtherPolynom) -> _TPolynom:
-        other = self._resolve_other('__sub__', other)
-        return self + other.swap_sign()
+        terms = self._terms.copy()
+        _add_terms(terms, self._resolve_other('__sub__', other), -1)
+        return self._from_terms(terms)
 
     def __rsub__(self, other: _OtherPolynom) -> _TPolynom:
-        return self - other
-
-    def __isub__(self, other: _OtherPolynom) -> _TPolynom:
-        return self - other
-
-    def _add_token(self, t: PolyToken) -> None:
-        for t1 in self._tokens:
-            if t1.power == t.power and t1.var == t.var:
-                t1.multiplier += t.multiplier
-                return
-        self._tokens.append(t)
+        return -self + other
+
+    def __mul__(self, other: _OtherPolynom) -> _TPolynom:
+        '''
+        Multiply by a number or a polynom.
+
+        Only terms of the same variable (or constants) can be multiplied,
+        since a term holds a single variable.
+        '''
+        other = self._resolve_other('__mul__', other)
+
+        terms = {}
+        for (var1, power1), multiplier1 in self._terms.items():
+            for (var2, power2), multiplier2 in _get_terms(other).items():
+                if var1 is None:
+                    key = var2, power2
+                elif var2 is None:
+                    key = var1, power1
+                elif var1 == var2:
+                    key = var1, power1 + power2
+                else:
+                    raise ValueError(f'Cannot multiply terms of different variables {var1} and {var2}')
+                terms[key] = terms.get(key, 0) + multiplier1 * multiplier2
+        return self._from_terms(terms)
+
+    def __rmul__(self, other: _OtherPolynom) -> _TPolynom:
+        return self * other
 
     def _resolve_other(self, method_name: str, other: _OtherPolynom) -> PolyToken | _TPolynom:
         if isinstance(other, str):
@@ -142,9 +222,124 @@ class Polynom:
         return other
 
     def _type_check(self, method_name: str, other: _OtherPolynom) -> None:
-        if isinstance(other, PolyToken) or isinstance(other, Polynom):
+        if isinstance(other, PolyToken) or isinstance(other, _BasePolynom):
             return
         self._raise_not_supported_type(method_name, other)
 
     def _raise_not_supported_type(self, method_name: str, other: Any) -> None:
         raise TypeError(f'{method_name} is not supported between {self.__class__.__name__} and {type(other).__name__}')
+
+
+class Polynom(_BasePolynom):
+    '''
+    A mutable polynom, ``+=``, ``-=`` and ``swap_sign`` change it in place.
+
+    Adding a term is O(1).
+    '''
+
+    __slots__ = ()
+
+    def copy(self) -> 'Polynom':
+        p = self._from_terms(self._terms.copy())
+        p._string = self._string
+        return p
+
+    def freeze(self) -> 'FrozenPolynom':
+        return FrozenPolynom._from_terms(self._terms.copy())
+
+    def swap_sign(self):
+        for key, multiplier in self._terms.items():
+            self._terms[key] = -multiplier
+        self._string = None
+        return self
+
+    def __iadd__(self, other: _OtherPolynom) -> 'Polynom':
+        _add_terms(self._terms, self._resolve_other('__add__', other), 1)
+        self._string = None
+        return self
+
+    def __isub__(self, other: _OtherPolynom) -> 'Polynom':
+        _add_terms(self._terms, self._resolve_other('__sub__', other), -1)
+        self._string = None
+        return self
+
+
+class FrozenPolynom(_BasePolynom):
+    '''
+    An immutable, hashable polynom.
+
+    It can be cached and shared freely: all operators return new polynoms,
+    ``+=`` and ``-=`` rebind the name like they do for tuples.
+    Single-term polynoms made by ``term`` are interned.
+    '''
+
+    __slots__ = ('_hash',)
+
+    _interned: dict[tuple[TermKey, float], 'FrozenPolynom'] = {}
+    _max_interned = 4096
+
+    @classmethod
+    def _from_terms(cls, terms: dict[TermKey, float]) -> 'FrozenPolynom':
+        p = super()._from_terms(terms)
+        p._hash = None
+        return p
+
+    def __init__(self, *tokens: _OtherPolynom) -> None:
+        super().__init__(*tokens)
+        self._hash: Optional[int] = None
+
+    @classmethod
+    def term(cls, var: Optional[str | Var] = None, multiplier: float = 1.0, power: float = 1.0) -> 'FrozenPolynom':
+        '''Get the polynom ``multiplier * var^power``, the same object for the same arguments.'''
+        token = PolyToken(var, multiplier, power)
+        key = token.key, multiplier
+        p = cls._interned.get(key)
+        if p is None:
+            p = cls._from_terms({token.key: multiplier})
+            if len(cls._interned) < cls._max_interned:
+                cls._interned[key] = p
+        return p
+
+    def thaw(self) -> Polynom:
+        return Polynom._from_terms(self._terms.copy())
+
+    def swap_sign(self) -> 'FrozenPolynom':
+        return -self
+
+    def __hash__(self) -> int:
+        if self._hash is None:
+            self._hash = hash(frozenset(_get_nonzero_terms(self).items()))
+        return self._hash
+
+    def __eq__(self, other: Any) -> bool:
+        # terms that cancelled out are kept for printing, but do not make polynoms different
+        if not isinstance(other, _BasePolynom):
+            return NotImplemented
+        return _get_nonzero_terms(self) == _get_nonzero_terms(other)
+
+
+def _get_nonzero_terms(p: _BasePolynom) -> dict[TermKey, float]:
+    return {key: multiplier for key, multiplier in p._terms.items() if multiplier}
+
+
+def _get_terms(other: PolyToken | _BasePolynom) -> dict[TermKey, float]:
+    return other._terms if isinstance(other, _BasePolynom) else {other.key: other.multiplier}
+
+
+def _add_terms(terms: dict[TermKey, float], other: PolyToken | _BasePolynom, sign: int) -> None:
+    for key, multiplier in _get_terms(other).items():
+        terms[key] = terms.get(key, 0) + sign * multiplier
+
+
+def _format_term(key: TermKey, multiplier: float) -> str:
+    var, power = key
+    if var is None:
+        return f'({multiplier})'
+
+    multiplier = '' if multiplier == 1 else f'({multiplier})'
+    times = ' * ' if multiplier else ''
+    power = power if power != 1 else ''
+    to = '^{' if power else ''
+    end = '}' if power else ''
+
+    return f'{multiplier}{times}{var}{to}{power}{end}'
@@ -1,8 +1,9 @@
 from contextlib import nullcontext
 
+import numpy as np
 import pytest
 
-from .polynom import Var, Polynom, PolyToken
+from .polynom import Var, FrozenPolynom, Polynom, PolyToken
 
 
 NO_ERROR = nullcontext()
@@ -66,3 +67,119 @@ def test_add(p1, p2, expected_result):
 def test_sub(p1, p2, expected_result):
     p = p1 - p2
     assert str(p) == expected_result
+
+
+def test_add_does_not_change_operands():
+    p1 = Polynom.from_tokens(Var('x'), 1)
+    p2 = Polynom.from_tokens(Var('x'))
+
+    p = p1 - p2
+
+    assert str(p) == '(0.0) * x + (1.0)'
+    assert str(p1) == 'x + (1.0)'
+    assert str(p2) == 'x'
+
+
+def test_iadd():
+    p = Polynom.from_tokens(Var('x'))
+    p_id = id(p)
+    assert str(p) == 'x'
+
+    p += PolyToken('x', 2.0, 2)
+    p -= 3
+
+    assert id(p) == p_id
+    assert str(p) == '(2.0) * x^{2} + x + (-3.0)'
+
+
+@pytest.mark.parametrize(
+    'p1, p2, expected_result',
+    (
+        (Polynom.from_tokens(Var('x'), 1), Polynom.from_tokens(Var('x'), -1), 'x^{2.0} + (0.0) * x + (-1.0)'),
+        (Polynom.from_tokens(Var('x'), 1), 2, '(2.0) * x + (2.0)'),
+        (Polynom.from_tokens(Var('x')), PolyToken('x', 3.0, 2), '(3.0) * x^{3.0}'),
+    ),
+)
+def test_mul(p1, p2, expected_result):
+    assert str(p1 * p2) == expected_result
+
+
+def test_mul_different_vars():
+    with pytest.raises(ValueError):
+        Polynom.from_tokens(Var('x')) * Polynom.from_tokens(Var('y'))
+
+
+@pytest.mark.parametrize(
+    'x, expected_result',
+    (
+        (0, -1),
+        (3, 20),
+        ({'x': 3, 'y': 1}, 21),
+    ),
+)
+def test_evaluate(x, expected_result):
+    p = Polynom.from_tokens(PolyToken('x', 2.0, 2), Var('x'), -1)
+    if isinstance(x, dict):
+        p += Var('y')
+
+    assert p.evaluate(x) == expected_result
+
+
+def test_frozen_polynom():
+    p = FrozenPolynom(Var('x'), 1)
+    q = p
+    q += Var('x')
+    q -= 2
+
+    assert str(p) == 'x + (1.0)'
+    assert str(q) == '(2.0) * x + (-1.0)'
+    assert isinstance(q, FrozenPolynom)
+    assert str(p.swap_sign()) == '(-1.0) * x + (-1.0)'
+    assert str(p) == 'x + (1.0)'
+
+
+def test_frozen_polynom_hash():
+    p = FrozenPolynom(Var('x'), 1)
+
+    assert p == FrozenPolynom(1, Var('x'))
+    assert p == Polynom(Var('x'), 1)
+    assert p != FrozenPolynom(Var('x'), 2)
+    assert len({p, FrozenPolynom(1, Var('x')), p.thaw().freeze()}) == 1
+
+
+def test_frozen_polynom_ignores_cancelled_terms():
+    p = FrozenPolynom(Var('x'), 1) - 1
+    q = FrozenPolynom(Var('x'))
+
+    assert str(p) == 'x + (0.0)'
+    assert p == q
+    assert hash(p) == hash(q)
+    assert len({p, q}) == 1
+    assert p != FrozenPolynom(Var('x'), 1)
+
+
+def test_frozen_polynom_term():
+    term = FrozenPolynom.term('K_{3}')
+
+    assert term is FrozenPolynom.term('K_{3}')
+    assert term is not FrozenPolynom.term('K_{3}', 2.0)
+    assert str(term - term) == '(0.0) * K_{3}'
+    assert str(term) == 'K_{3}'
+
+
+@pytest.mark.parametrize('exact', (False, True))
+def test_evaluate_many(exact):
+    p = Polynom.from_coefficients([-1, 0, 2])
+
+    values = p.evaluate(np.arange(4), exact=exact)
+
+    assert str(p) == '(2) * x^{2} + (-1)'
+    assert values.tolist() == [-1, 1, 7, 17]
+    assert p.evaluate([0, 1]).tolist() == [-1, 1]
+
+
+def test_evaluate_exact():
+    p = Polynom.from_coefficients([0, 0, 1.0]) * PolyToken('x', 1.0, 30)
+
+    assert p.evaluate(np.array([3]), exact=True)[0] == 3 ** 32
+    assert p.evaluate(3, exact=True) == 3 ** 32
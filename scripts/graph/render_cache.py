@@ -0,0 +1,101 @@
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Optional, Union
+
+from .lru_cache import LRUCache
+
+
+class RenderCache:
+    '''
+    A content-addressed on-disk cache of rendered figures.
+
+    Entries are text files named by the key. Reading an entry touches the file,
+    so the least recently used files (by mtime) are removed once the directory grows over ``max_size`` bytes.
+    Recent entries are also kept in memory. Files are written atomically,
+    so several processes may share one directory.
+    '''
+
+    def __init__(self, directory: Union[str, os.PathLike], max_size: int = 64 * 2 ** 20, memory_size: int = 256) -> None:
+        self.directory = Path(directory)
+        self.max_size = max_size
+        self._memory = LRUCache(memory_size)
+        self._size: Optional[int] = None
+
+    @staticmethod
+    def make_key(source: str, options: dict[str, Any]) -> str:
+        '''Hash of the rendered ``source`` together with the render ``options``.'''
+        digest = hashlib.sha256(json.dumps(options, sort_keys=True).encode())
+        digest.update(b'\0')
+        digest.update(source.encode())
+        return digest.hexdigest()
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._memory or self._get_path(key).exists()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = self._memory.get(key)
+        if value is not None:
+            return value
+
+        path = self._get_path(key)
+        try:
+            value = path.read_text()
+            os.utime(path)
+        except OSError:
+            return default
+        self._memory[key] = value
+        return value
+
+    def __setitem__(self, key: str, value: str) -> None:
+        self._memory[key] = value
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile('w', dir=self.directory, suffix='.tmp', delete=False) as file:
+                file.write(value)
+            os.replace(file.name, self._get_path(key))
+        except OSError:
+            # the cache is only an optimization
+            return
+
+        if self._size is None:
+            self._size = self._get_entries_size()
+        else:
+            self._size += len(value.encode())
+        if self._size > self.max_size:
+            self._evict()
+
+    def clear(self) -> None:
+        self._memory.clear()
+        for path in self.directory.glob('*.tex'):
+            path.unlink(missing_ok=True)
+        self._size = 0
+
+    def _get_path(self, key: str) -> Path:
+        return self.directory / f'{key}.tex'
+
+    def _get_entries(self) -> list[tuple[float, int, Path]]:
+        entries = []
+        for path in self.directory.glob('*.tex'):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _get_entries_size(self) -> int:
+        return sum(size for _, size, _ in self._get_entries())
+
+    def _evict(self) -> None:
+        entries = sorted(self._get_entries(), key=lambda entry: entry[0])
+        size = sum(size for _, size, _ in entries)
+        for _, entry_size, path in entries:
+            if size <= self.max_size:
+                break
+            path.unlink(missing_ok=True)
+            self._memory.pop(path.stem)
+            size -= entry_size
+        self._size = size
@@ -0,0 +1,167 @@
+import json
+import mmap
+import struct
+from array import array
+from os import PathLike
+from typing import BinaryIO, Union
+
+import numpy as np
+
+from .compact_graph import AnyGraph, CompactGraph
+from .digraph import Digraph
+from .graph import Graph
+
+
+SNAPSHOT_MAGIC = b'GRAPHSNP'
+SNAPSHOT_VERSION = 1
+
+_DIRECTIONAL = 1
+_WEIGHTED = 2
+
+# magic, version, flags, vertex count, edge count, CSR target count,
+# label size, names size, attributes size (sizes in bytes)
+_HEADER = struct.Struct('<8sIIQQQQQQ')
+_ALIGNMENT = 8
+
+
+def save_snapshot(graph: Graph, file: Union[str, PathLike, BinaryIO]) -> None:
+    '''
+    Save ``graph`` in the binary snapshot format read by ``load_snapshot``.
+
+    The file holds the vertex names, CSR arrays of the edges (``int32``), their weights (``float64``, NaN for None),
+    the position of every edge in the CSR arrays and the DOT attributes as JSON. Every section is 8-byte aligned.
+    Vertex and edge order (and the direction of every non-directional edge) is preserved.
+
+    :param file: A path or a file open for binary writing.
+    '''
+    if isinstance(file, (str, PathLike)):
+        with open(file, 'wb') as f:
+            return save_snapshot(graph, f)
+
+    names = [vertex.name for vertex in graph.vertices]
+    index = {name: i for i, name in enumerate(names)}
+    edges = graph.edges
+    n, m = len(names), len(edges)
+
+    v1 = np.fromiter((index[edge.v1.name] for edge in edges), dtype=np.int32, count=m)
+    v2 = np.fromiter((index[edge.v2.name] for edge in edges), dtype=np.int32, count=m)
+    weights = np.fromiter(
+        (np.nan if edge.weight is None else edge.weight for edge in edges), dtype=np.float64, count=m
+    )
+
+    # every edge is stored as v1 -> v2, non-directional ones also as v2 -> v1 right after it
+    # (except for loops), the same layout as CompactGraph.from_edges
+    sources, targets, arc_weights = v1, v2, weights
+    forward = np.ones(m, dtype=bool)
+    if not graph.directional:
+        stored = np.stack((forward, v1 != v2), axis=1).ravel()
+        forward = np.stack((forward, np.zeros(m, dtype=bool)), axis=1).ravel()[stored]
+        sources = np.stack((v1, v2), axis=1).ravel()[stored]
+        targets = np.stack((v2, v1), axis=1).ravel()[stored]
+        arc_weights = np.repeat(weights, 2)[stored]
+    order = np.argsort(sources, kind='stable')
+    positions = np.empty(len(order), dtype=np.int32)
+    positions[order] = np.arange(len(order), dtype=np.int32)
+    edge_arcs = positions[forward]
+    offsets = np.zeros(n + 1, dtype=np.int32)
+    np.cumsum(np.bincount(sources, minlength=n), out=offsets[1:])
+
+    flags = (_DIRECTIONAL if graph.directional else 0)
+    weighted = not np.isnan(weights).all()
+    if weighted:
+        flags |= _WEIGHTED
+
+    name_offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum([len(name) for name in names], out=name_offsets[1:])
+    label = str(graph.label).encode()
+    names_blob = ''.join(names).encode()
+    attributes = json.dumps({
+        'vertices': {i: v.dot_attributes for i, v in enumerate(graph.vertices) if v.dot_attributes},
+        'edges': {k: e.dot_attributes for k, e in enumerate(edges) if e.dot_attributes},
+    }).encode()
+
+    file.write(_HEADER.pack(
+        SNAPSHOT_MAGIC, SNAPSHOT_VERSION, flags, n, m, len(targets), len(label), len(names_blob), len(attributes)
+    ))
+    sections = [label, name_offsets.tobytes(), names_blob, offsets.tobytes(), targets[order].tobytes(), edge_arcs.tobytes()]
+    if weighted:
+        sections.append(arc_weights[order].tobytes())
+    sections.append(attributes)
+    for section in sections:
+        file.write(section)
+        file.write(bytes(-len(section) % _ALIGNMENT))
+
+
+def load_snapshot(path: Union[str, PathLike], compact: bool = False) -> AnyGraph:
+    '''
+    Load a graph saved by ``save_snapshot``.
+
+    The file is memory-mapped read-only. With ``compact=True`` the ``CompactGraph`` arrays
+    are views of the mapping, so nothing but the names is copied and processes loading the same
+    file share its pages. Otherwise a ``Graph``/``Digraph`` with DOT attributes is built.
+
+    :param compact: Return a ``CompactGraph`` (DOT attributes are not loaded).
+    '''
+    with open(path, 'rb') as file:
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    # the views below keep the mapping alive
+    buffer = memoryview(mapped)
+
+    if len(buffer) < _HEADER.size:
+        raise ValueError(f'{path} is not a graph snapshot')
+    magic, version, flags, n, m, arc_count, label_size, names_size, attributes_size = _HEADER.unpack_from(buffer)
+    if magic != SNAPSHOT_MAGIC:
+        raise ValueError(f'{path} is not a graph snapshot')
+    if version != SNAPSHOT_VERSION:
+        raise ValueError(f'Unsupported graph snapshot version {version}')
+
+    section_sizes = [label_size, (n + 1) * 8, names_size, (n + 1) * 4, arc_count * 4, m * 4]
+    if flags & _WEIGHTED:
+        section_sizes.append(arc_count * 8)
+    section_sizes.append(attributes_size)
+    if len(buffer) < _HEADER.size + sum(size + -size % _ALIGNMENT for size in section_sizes):
+        raise ValueError(f'{path} is truncated')
+
+    position = _HEADER.size
+
+    def take(size: int) -> memoryview:
+        nonlocal position
+        section = buffer[position:position + size]
+        position += size + -size % _ALIGNMENT
+        return section
+
+    label = str(take(label_size), 'utf-8')
+    name_offsets = take((n + 1) * 8).cast('q')
+    names_text = str(take(names_size), 'utf-8')
+    names = [names_text[name_offsets[i]:name_offsets[i + 1]] for i in range(n)]
+    offsets = take((n + 1) * 4).cast('i')
+    targets = take(arc_count * 4).cast('i')
+    edge_arcs = take(m * 4).cast('i')
+    weights = take(arc_count * 8).cast('d') if flags & _WEIGHTED else None
+    directional = bool(flags & _DIRECTIONAL)
+
+    if compact:
+        if weights is not None and np.isnan(np.frombuffer(weights)).any():
+            # CompactGraph weighs edges without weight 1
+            weights = array('d', np.nan_to_num(np.frombuffer(weights), nan=1.0).tobytes())
+        return CompactGraph(names, offsets, targets, weights, directional, label)
+
+    attributes = json.loads(str(take(attributes_size), 'utf-8'))
+    arcs = np.frombuffer(edge_arcs, dtype=np.int32)
+    sources = (np.searchsorted(np.frombuffer(offsets, dtype=np.int32), arcs, side='right') - 1).tolist()
+    edge_targets = np.frombuffer(targets, dtype=np.int32)[arcs].tolist()
+    edge_weights = [None] * m if weights is None else np.frombuffer(weights)[arcs].tolist()
+
+    graph = Digraph(label) if directional else Graph(label)
+    for name in names:
+        graph.add_vertex(name)
+    edges = []
+    for v1, v2, weight in zip(sources, edge_targets, edge_weights):
+        edges.append(graph.add_edge(names[v1], names[v2], None if weight != weight else weight))
+
+    vertices = graph.vertices
+    for i, dot_attributes in attributes['vertices'].items():
+        vertices[int(i)].set_dot_attributes(dot_attributes)
+    for k, dot_attributes in attributes['edges'].items():
+        edges[int(k)].set_dot_attributes(dot_attributes)
+    return graph
@@ -1,8 +1,48 @@
+import io
+import os
+import pickle
+import subprocess
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
 import pytest
 
+from .adjacency_matrix import read_adjacency_matrix
+from .compact_graph import CompactGraph
+from .digraph import Digraph
+from .dot_reader import read_dot
+from .dynamic_distances import DynamicDistances
 from .graph import Graph
+from .graph_listener import GraphListener
 from .helpers import mkg
-from .algorithms import ChromaticPolynomCreator, is_full, is_null, get_adjacent_vertices, is_tree
+from .algorithms import (
+    ChromaticPolynomCreator,
+    is_full,
+    is_null,
+    get_adjacent_vertices,
+    is_tree,
+    check_tree,
+    is_cycled,
+    get_radius,
+    get_diameter,
+    get_adjacency_matrix,
+    get_centers,
+    get_eccentricities,
+    get_floyd_matrix,
+    get_canonical_form,
+    PruferCodeCreator,
+    edges_from_prufer_code,
+    graph_from_prufer_code,
+)
+from .infinity import inf
+from .lru_cache import LRUCache
+from .vertex import Vertex
+from . import algorithms, helpers
+from .matrix import get_floyd_array
+from .render_cache import RenderCache
+from .snapshot import load_snapshot, save_snapshot
 
 
 @pytest.mark.parametrize(
@@ -126,6 +166,83 @@ def test_get_chromatic_polynom(graph: Graph, strategy, expected_polynom) -> None
     assert chromatic_polynom == expected_polynom
 
 
+@pytest.mark.parametrize(
+    'graph, expected_coefficients',
+    (
+        (mkg(['A']), [0, 1]),
+        (mkg(['A', 'B']), [0, 0, 1]),
+        (mkg(edges=[('A', 'B')]), [0, -1, 1]),
+        (mkg(edges=[('A', 'B'), ('A', 'D'), ('A', 'C'), ('C', 'D')]), [0, -2, 5, -4, 1]),
+        (mkg(edges=[('A', 'B'), ('B', 'C'), ('C', 'D'), ('D', 'A')]), [0, -3, 6, -4, 1]),
+        (mkg(['E'], [('A', 'B'), ('B', 'C'), ('C', 'A')]), [0, 0, 2, -3, 1]),
+        (mkg(edges=[(a, b) for a in range(5) for b in range(a + 1, 5)]), [0, 24, -50, 35, -10, 1]),
+        (
+            mkg(edges=[('A', 'B'), ('B', 'C'), ('C', 'D'), ('D', 'A'), ('A', 'C'), ('B', 'E'), ('E', 'D')]),
+            [0, 10, -23, 19, -7, 1],
+        ),
+        (mkg(edges=[('A', 'B'), ('B', 'C'), ('C', 'A'), ('C', 'D'), ('D', 'E'), ('E', 'C')]), [0, 4, -12, 13, -6, 1]),
+        (
+            mkg(edges=[
+                ('A', 'B'), ('B', 'D'), ('C', 'D'), ('D', 'E'), ('C', 'H'), ('D', 'H'), ('E', 'I'),
+                ('E', 'J'), ('F', 'J'), ('G', 'H'), ('H', 'I'), ('H', 'K'), ('I', 'K'), ('K', 'L'),
+            ]),
+            [0, -12, 108, -439, 1064, -1709, 1911, -1519, 859, -339, 89, -14, 1],
+        ),
+    ),
+)
+def test_get_chromatic_coefficients(graph: Graph, expected_coefficients) -> None:
+    assert ChromaticPolynomCreator.get_chromatic_coefficients(graph) == expected_coefficients
+
+
+@pytest.mark.parametrize('depth', (None, 1, 3))
+def test_get_chromatic_coefficients_parallel(depth) -> None:
+    graph = mkg(edges=[('A', 'B'), ('B', 'C'), ('C', 'D'), ('D', 'A'), ('A', 'C'), ('B', 'E'), ('E', 'D'), ('E', 'F')])
+    expected_coefficients = ChromaticPolynomCreator.get_chromatic_coefficients(graph)
+
+    ChromaticPolynomCreator.clear_cache()
+    coefficients = ChromaticPolynomCreator.get_chromatic_coefficients(graph, workers=2, depth=depth)
+    assert coefficients == expected_coefficients
+
+
+def test_get_chromatic_coefficients_parallel_solves_in_pool(monkeypatch) -> None:
+    # a wheel and a 6-cycle with a chord sharing the cut vertex F, plus a separate wheel
+    graph = mkg(edges=[
+        ('A', 'B'), ('A', 'C'), ('A', 'D'), ('A', 'E'), ('A', 'F'), ('B', 'C'), ('C', 'D'), ('D', 'E'), ('E', 'F'), ('F', 'B'),
+        ('F', 'G'), ('G', 'H'), ('H', 'I'), ('I', 'J'), ('J', 'K'), ('K', 'F'), ('F', 'I'),
+        ('L', 'M'), ('L', 'N'), ('L', 'O'), ('L', 'P'), ('L', 'Q'), ('M', 'N'), ('N', 'O'), ('O', 'P'), ('P', 'Q'), ('Q', 'M'),
+    ])
+    expected_coefficients = ChromaticPolynomCreator.get_chromatic_coefficients(graph)
+    ChromaticPolynomCreator.clear_cache()
+
+    # everything is recorded in the parent, so this holds whatever start method the pool uses
+    parent = os.getpid()
+    solve_coefficients = ChromaticPolynomCreator._solve_coefficients
+    parent_calls = []
+    submitted = []
+
+    def record(cls, form):
+        if os.getpid() == parent:
+            parent_calls.append(form)
+        return solve_coefficients(form)
+
+    class RecordingExecutor(ProcessPoolExecutor):
+        def map(self, fn, *iterables, **kwargs):
+            forms = list(iterables[0])
+            submitted.extend(forms)
+            return super().map(fn, forms, **kwargs)
+
+    monkeypatch.setattr(ChromaticPolynomCreator, '_solve_coefficients', classmethod(record))
+    monkeypatch.setattr(algorithms, 'ProcessPoolExecutor', RecordingExecutor)
+    assert ChromaticPolynomCreator.get_chromatic_coefficients(graph, workers=2, depth=1) == expected_coefficients
+    assert parent_calls == []
+
+    # only irreducible factors go to the pool, each once
+    assert submitted
+    assert len(set(submitted)) == len(submitted)
+    for form in submitted:
+        assert algorithms._reduce_chromatic_form(form, algorithms._canonical_form_to_adjacency(form)) is None
+
+
 @pytest.mark.parametrize(
     'graph, target_vertex, expected_vertices',
     (
@@ -157,3 +274,795 @@ def test_get_adjacent_vertices(graph: Graph, target_vertex: str, expected_vertic
 def test_is_tree(graph: Graph, expected: bool) -> None:
     graph_is_tree = is_tree(graph)
     assert graph_is_tree == expected
+    assert check_tree(graph).is_tree == expected
+    assert is_tree(CompactGraph.from_graph(graph)) == expected
+
+
+def _mkdg(edges):
+    graph = Digraph()
+    for edge in edges:
+        graph.add_edge(*edge)
+    return graph
+
+
+@pytest.mark.parametrize(
+    'graph, expected_component_count, expected_cycle',
+    (
+        (mkg(), 0, None),
+        (mkg(['a', 'b']), 2, None),
+        (mkg(['z'], [('a', 'b'), ('b', 'c'), ('c', 'd'), ('d', 'b')]), 2, {'b', 'c', 'd'}),
+        (mkg(edges=[('a', 'b'), ('b', 'b')]), 1, {'b'}),
+        (_mkdg([('a', 'b'), ('c', 'b')]), 1, None),
+    ),
+)
+def test_check_tree(graph: Graph, expected_component_count, expected_cycle):
+    for g in (graph, CompactGraph.from_graph(graph)):
+        result = check_tree(g)
+        assert result.component_count == expected_component_count
+        assert (result.cycle and set(result.cycle)) == expected_cycle
+
+
+def test_is_tree_deep_path():
+    n = 20000
+    path = CompactGraph.from_edges(range(n), [(i, i + 1) for i in range(n - 1)])
+    assert is_tree(path)
+
+    graph = path.to_graph()
+    assert is_tree(graph)
+    visited = {vertex: False for vertex in graph}
+    assert not is_cycled(graph, graph.get_vertex('0'), visited)
+    assert all(visited.values())
+
+    graph.add_edge('0', str(n - 1))
+    assert sorted(check_tree(graph).cycle, key=int) == [str(i) for i in range(n)]
+
+
+@pytest.mark.parametrize(
+    'graph, target_vertex, expected_neighbors, expected_successors, expected_predecessors',
+    (
+        (mkg(edges=[('a', 'b'), ('c', 'a')]), 'a', {'b', 'c'}, {'b', 'c'}, {'b', 'c'}),
+        (mkg(['d'], [('a', 'b')]), 'd', set(), set(), set()),
+        (_mkdg([('a', 'b'), ('c', 'a')]), 'a', {'b', 'c'}, {'b'}, {'c'}),
+        (_mkdg([('a', 'b'), ('b', 'a'), ('b', 'c')]), 'b', {'a', 'c'}, {'a', 'c'}, {'a'}),
+    ),
+)
+def test_incidence_index(graph: Graph, target_vertex, expected_neighbors, expected_successors, expected_predecessors):
+    assert {v.name for v in graph.neighbors(target_vertex)} == expected_neighbors
+    assert {v.name for v in graph.successors(target_vertex)} == expected_successors
+    assert {v.name for v in graph.predecessors(target_vertex)} == expected_predecessors
+
+
+@pytest.mark.parametrize(
+    'graph, target_vertex, expected_edges',
+    (
+        (mkg(edges=[('a', 'b'), ('c', 'a'), ('b', 'c')]), 'a', {('b', 'c')}),
+        (_mkdg([('a', 'b'), ('b', 'a'), ('b', 'c')]), 'b', set()),
+    ),
+)
+def test_remove_vertex(graph: Graph, target_vertex, expected_edges):
+    graph.remove_vertex(target_vertex)
+
+    assert set(graph._edges.keys()) == expected_edges
+    for vertex in graph:
+        assert target_vertex not in {v.name for v in graph.neighbors(vertex.name)}
+
+
+@pytest.mark.parametrize(
+    'edges, removed_edges, expected_degrees',
+    (
+        ([('a', 'b'), ('c', 'a')], [], {'a': (1, 1), 'b': (1, 0), 'c': (0, 1)}),
+        ([('a', 'b'), ('b', 'a'), ('a', 'a')], [], {'a': (2, 2), 'b': (1, 1)}),
+        ([('a', 'b'), ('a', 'c'), ('c', 'b')], [('a', 'c')], {'a': (0, 1), 'b': (2, 0), 'c': (0, 1)}),
+    ),
+)
+def test_digraph_degrees(edges, removed_edges, expected_degrees):
+    graph = _mkdg(edges)
+    for edge in removed_edges:
+        graph.remove_edge(*edge)
+
+    assert graph.degree_view() == expected_degrees
+    for name, (in_degree, out_degree) in expected_degrees.items():
+        assert graph.in_degree(name) == in_degree
+        assert graph.out_degree(name) == out_degree
+
+
+def _mkwg(edges):
+    graph = mkg()
+    for v1, v2, weight in edges:
+        graph.add_edge(v1, v2, weight)
+    return graph
+
+
+@pytest.mark.parametrize(
+    'graph, expected_radius, expected_diameter, expected_centers',
+    (
+        (mkg(['a']), 0, 0, {'a'}),
+        (mkg(edges=[('a', 'b'), ('b', 'c'), ('c', 'd')]), 2, 3, {'b', 'c'}),
+        (mkg(edges=[('a', 'b'), ('a', 'c'), ('a', 'd')]), 1, 2, {'a'}),
+        (mkg(['z'], [('a', 'b')]), inf, inf, {'a', 'b', 'z'}),
+        (_mkwg([('a', 'b', 5), ('b', 'c', 1), ('a', 'c', 1)]), 1, 2, {'c'}),
+        (_mkdg([('a', 'b'), ('b', 'c'), ('c', 'a')]), 2, 2, {'a', 'b', 'c'}),
+    ),
+)
+def test_eccentricity_metrics(graph: Graph, expected_radius, expected_diameter, expected_centers):
+    assert get_radius(graph) == expected_radius
+    assert get_diameter(graph) == expected_diameter
+    assert get_centers(graph) == expected_centers
+
+
+def test_eccentricities_negative_weights():
+    # a -> c -> b -> a is a negative cycle, the values are the ones of the classic Floyd-Warshall loop
+    graph = Digraph()
+    for v1, v2, weight in [('a', 'b', 1), ('a', 'c', 3), ('c', 'b', -5), ('b', 'x', 10), ('x', 'a', 1), ('b', 'a', 1), ('c', 'a', 1)]:
+        graph.add_edge(v1, v2, weight)
+
+    assert get_eccentricities(graph) == [7, 8, 3, 2]
+    assert get_radius(graph) == 2
+    assert get_centers(graph) == {'x'}
+    assert get_eccentricities(CompactGraph.from_graph(graph)) == [7, 8, 3, 2]
+
+
+def test_eccentricities_keep_int_weights():
+    graph = _mkwg([('a', 'b', 2), ('b', 'c', 3)])
+    eccentricities = get_eccentricities(graph)
+
+    assert eccentricities == [5, 3, 5]
+    assert all(type(e) is int for e in eccentricities)
+    assert get_eccentricities(_mkwg([('a', 'b', 2.5), ('b', 'c', 3)])) == [5.5, 3, 5.5]
+
+
+def test_eccentricities_follow_graph_changes():
+    graph = mkg(edges=[('a', 'b'), ('b', 'c'), ('c', 'd')])
+    assert get_diameter(graph) == 3
+
+    graph.add_edge('a', 'd')
+    assert get_diameter(graph) == 2
+
+    graph.remove_vertex('d')
+    assert get_centers(graph) == {'b'}
+
+
+@pytest.mark.parametrize(
+    'graph, expected_distances',
+    (
+        (mkg(['a', 'b']), [[0, np.inf], [np.inf, 0]]),
+        (mkg(edges=[('a', 'b'), ('b', 'c')]), [[0, 1, 2], [1, 0, 1], [2, 1, 0]]),
+        (_mkdg([('a', 'b'), ('b', 'c')]), [[0, 1, 2], [np.inf, 0, 1], [np.inf, np.inf, 0]]),
+        (_mkwg([('a', 'b', 5), ('b', 'c', 1), ('a', 'c', 1.5)]), [[0, 2.5, 1.5], [2.5, 0, 1], [1.5, 1, 0]]),
+    ),
+)
+def test_floyd(graph: Graph, expected_distances):
+    distances = get_floyd_array(graph)
+    assert distances.dtype == np.float64
+    np.testing.assert_array_equal(distances, expected_distances)
+
+    expected_matrix = [[inf if d == np.inf else d for d in row] for row in expected_distances]
+    assert get_floyd_matrix(graph) == expected_matrix
+
+
+@pytest.mark.parametrize(
+    'g1, g2, expected_equal',
+    (
+        (mkg(edges=[('a', 'b'), ('b', 'c')]), mkg(edges=[('x', 'y'), ('z', 'x')]), True),
+        (mkg(edges=[('a', 'b'), ('b', 'c'), ('c', 'd'), ('d', 'a')]), mkg(edges=[(1, 3), (3, 2), (2, 4), (4, 1)]), True),
+        (mkg(['d'], [('a', 'b'), ('b', 'c')]), mkg(['c'], [('b', 'a'), ('a', 'd')]), True),
+        (mkg(edges=[('a', 'b'), ('b', 'c')]), mkg(['c'], [('a', 'b')]), False),
+        (mkg(edges=[('a', 'b'), ('b', 'c'), ('c', 'd')]), mkg(edges=[('a', 'b'), ('a', 'c'), ('a', 'd')]), False),
+    ),
+)
+def test_get_canonical_form(g1: Graph, g2: Graph, expected_equal: bool):
+    assert (get_canonical_form(g1) == get_canonical_form(g2)) == expected_equal
+
+
+def test_lru_cache():
+    cache = LRUCache(2)
+    cache['a'] = 1
+    cache['b'] = 2
+    assert cache.get('a') == 1
+    cache['c'] = 3
+
+    assert 'b' not in cache
+    assert cache.get('a') == 1 and cache.get('c') == 3
+    assert len(cache) == 2
+
+
+_TASK4_TREE = [(3, 4), (4, 5), (5, 6), (1, 7), (1, 8), (1, 9), (2, 9), (2, 10), (5, 10), (10, 11)]
+
+
+@pytest.mark.parametrize(
+    'graph, root, expected_code',
+    (
+        (mkg(edges=[(1, 2), (2, 3)]), None, [2]),
+        (mkg(edges=[(1, 2), (2, 3), (3, 4)]), None, [2, 3]),
+        (mkg(edges=[(1, 2), (2, 3), (3, 4)]), 1, [3, 2]),
+        (mkg(edges=_TASK4_TREE), None, [4, 5, 5, 10, 1, 1, 9, 2, 10]),
+        (mkg(edges=_TASK4_TREE), 5, [4, 5, 5, 1, 1, 9, 2, 10, 10]),
+    ),
+)
+def test_get_prufer_code(graph: Graph, root, expected_code):
+    root = None if root is None else graph.get_vertex(root)
+    assert PruferCodeCreator.get_prufer_code(graph, root) == expected_code
+
+
+@pytest.mark.parametrize(
+    'graph',
+    (
+        mkg(edges=[(1, 2), (2, 3), (3, 1), (3, 4)]),
+        mkg(edges=[(1, 2), (3, 4)]),
+        mkg(['5'], [(1, 2), (2, 3), (3, 4)]),
+    ),
+)
+def test_get_prufer_code_not_tree(graph: Graph):
+    with pytest.raises(ValueError):
+        PruferCodeCreator.get_prufer_code(graph)
+    with pytest.raises(ValueError):
+        list(PruferCodeCreator.iter_prufer_code(graph))
+
+
+@pytest.mark.parametrize(
+    'code, expected_edges',
+    (
+        ([], [1, 2]),
+        ([2], [2, 1, 2, 3]),
+        ([4, 5, 5, 10, 1, 1, 9, 2, 10], [4, 3, 5, 4, 5, 6, 10, 5, 1, 7, 1, 8, 9, 1, 2, 9, 10, 2, 10, 11]),
+    ),
+)
+def test_edges_from_prufer_code(code, expected_edges):
+    assert edges_from_prufer_code(code).tolist() == expected_edges
+
+
+def test_prufer_code_round_trip():
+    graph = graph_from_prufer_code([7, 3, 3, 9, 3, 4, 4, 5, 6])
+    assert PruferCodeCreator.get_prufer_code(graph) == [7, 3, 3, 9, 3, 4, 4, 5, 6]
+
+
+def test_edges_from_prufer_code_invalid():
+    with pytest.raises(ValueError):
+        edges_from_prufer_code([1, 5])
+
+
+@pytest.mark.parametrize(
+    'graph, expected_adjacent',
+    (
+        (mkg(['d'], [('a', 'b'), ('b', 'c')]), {'a': ['b'], 'b': ['a', 'c'], 'c': ['b'], 'd': []}),
+        (_mkdg([('a', 'b'), ('b', 'c'), ('c', 'a')]), {'a': ['b'], 'b': ['c'], 'c': ['a']}),
+        (mkg(edges=[('a', 'a'), ('a', 'b')]), {'a': ['a', 'b'], 'b': ['a']}),
+    ),
+)
+def test_compact_graph(graph: Graph, expected_adjacent):
+    compact = CompactGraph.from_graph(graph)
+
+    assert len(compact) == len(graph)
+    assert compact.edge_count == len(graph.edges)
+    for name, expected in expected_adjacent.items():
+        assert sorted(compact.name(v) for v in compact.adjacent(compact.index(name))) == expected
+
+    restored = compact.to_graph()
+    assert type(restored) is type(graph)
+    assert [v.name for v in restored] == [v.name for v in graph]
+    assert {frozenset(key) for key in restored._edges} == {frozenset(key) for key in graph._edges}
+
+
+def test_algorithms_accept_compact_graph():
+    graph = mkg(edges=_TASK4_TREE)
+    compact = CompactGraph.from_graph(graph)
+
+    assert get_radius(compact) == get_radius(graph)
+    assert get_centers(compact) == get_centers(graph)
+    np.testing.assert_array_equal(get_floyd_array(compact), get_floyd_array(graph))
+    assert get_canonical_form(compact) == get_canonical_form(graph)
+    assert ChromaticPolynomCreator.get_chromatic_coefficients(compact) == ChromaticPolynomCreator.get_chromatic_coefficients(graph)
+    assert PruferCodeCreator.get_prufer_code(compact, '5') == [4, 5, 5, 1, 1, 9, 2, 10, 10]
+    assert is_null(compact) is False
+
+
+def test_dot_attributes_are_per_instance():
+    graph = mkg(edges=[('a', 'b')])
+    a, b = graph.get_vertex('a'), graph.get_vertex('b')
+    edge = graph.get_edge('a', 'b')
+
+    a.update_dot_attributes({'color': 'red'})
+    edge.update_dot_attributes({'label': 'ab'})
+
+    assert a.dot_attributes == {'color': 'red'}
+    assert b.dot_attributes is None
+    assert edge.dot_attributes == {'label': 'ab'}
+    assert b.dot == '"b" '
+    assert not hasattr(a, '__dict__') and not hasattr(edge, '__dict__')
+
+
+def test_lazy_copy():
+    graph = mkg(edges=[('a', 'b'), ('b', 'c'), ('c', 'd')])
+    copy = graph.copy(lazy=True)
+
+    copy.merge_edge('b', 'c')
+    copy.add_edge('a', 'd')
+    graph.remove_vertex('a')
+    graph.add_edge('b', 'd')
+
+    assert set(graph._vertices.keys()) == {'b', 'c', 'd'}
+    assert set(graph._edges.keys()) == {('b', 'c'), ('c', 'd'), ('b', 'd')}
+    assert {v.name for v in graph.neighbors('b')} == {'c', 'd'}
+
+    assert set(copy._vertices.keys()) == {'a', 'b', 'd'}
+    assert set(copy._edges.keys()) == {('a', 'b'), ('b', 'd'), ('a', 'd')}
+    assert {v.name for v in copy.neighbors('b')} == {'a', 'd'}
+
+    copy.materialize()
+    assert isinstance(copy._edges, dict)
+    assert copy.get_vertex('b') is not graph.get_vertex('b')
+    assert set(copy._edges.keys()) == {('a', 'b'), ('b', 'd'), ('a', 'd')}
+
+
+def test_lazy_copy_keeps_dict_order():
+    graph = mkg(edges=[('a', 'b'), ('b', 'c'), ('c', 'd')])
+    lazy, deep = graph.copy(lazy=True), graph.copy()
+    for g in (lazy, deep):
+        g.remove_vertex('a')
+        g.add_edge('d', 'e')
+        g.add_vertex('a')
+        g.remove_edge('b', 'c')
+        g.add_edge('b', 'c')
+        g.add_edge('a', 'b')
+
+    assert [v.name for v in lazy] == [v.name for v in deep] == ['b', 'c', 'd', 'e', 'a']
+    assert list(lazy._edges) == list(deep._edges)
+    assert lazy.dot == deep.dot
+    assert get_adjacency_matrix(lazy, 0, 0) == get_adjacency_matrix(deep, 0, 0)
+
+    assert [v.name for v in lazy.copy(lazy=True)] == [v.name for v in deep]
+    assert [v.name for v in lazy.materialize()] == [v.name for v in deep]
+
+
+@pytest.mark.parametrize(
+    'graph, pairs, expected_vertices, expected_edges, expected_merged',
+    (
+        (
+            mkg(edges=[('a', 'b'), ('b', 'c'), ('c', 'd')]),
+            [('a', 'b'), ('b', 'c')],
+            {'a', 'd'},
+            {('a', 'd')},
+            {'b': 'a', 'c': 'a'},
+        ),
+        (
+            mkg(edges=[('a', 'b'), ('b', 'c'), ('c', 'a'), ('c', 'd')]),
+            [('c', 'd'), ('d', 'a'), ('a', 'b')],
+            {'b'},
+            set(),
+            {'d': 'b', 'a': 'b', 'c': 'b'},
+        ),
+        (
+            mkg(['e'], [('a', 'b'), ('c', 'd')]),
+            [('a', 'e'), ('d', 'c')],
+            {'a', 'b', 'c', 'e'},
+            {('a', 'b')},
+            {'d': 'c'},
+        ),
+    ),
+)
+def test_contract_many(graph: Graph, pairs, expected_vertices, expected_edges, expected_merged):
+    merged = graph.contract_many(pairs)
+
+    assert merged == expected_merged
+    assert set(graph._vertices.keys()) == expected_vertices
+    assert set(graph._edges.keys()) == expected_edges
+
+
+def test_merge_edge_keeps_edge_data():
+    graph = mkg(edges=[('a', 'b'), ('b', 'c')])
+    edge = graph.get_edge('b', 'c')
+    edge.weight = 3
+    edge.set_dot_attributes({'label': 'bc'})
+
+    graph.merge_edge('a', 'b')
+
+    merged = graph.get_edge('a', 'c')
+    assert merged.weight == 3
+    assert merged.dot_attributes == {'label': 'bc'}
+
+
+_MATRIX = """\
+0, 1, 0, 2, 
+1, 0, 1, 0, 
+0, 1, 0, 0, 
+2, 0, 0, 0, 
+"""
+
+
+@pytest.mark.parametrize('vectorized', (False, True))
+@pytest.mark.parametrize('use_mmap', (False, True))
+def test_read_adjacency_matrix(tmp_path, vectorized, use_mmap):
+    path = tmp_path / 'graph.txt'
+    path.write_text(_MATRIX)
+
+    graph = read_adjacency_matrix(path, vectorized=vectorized, use_mmap=use_mmap)
+
+    assert [v.name for v in graph.vertices] == ['1', '2', '3', '4']
+    assert set(graph._edges.keys()) == {('1', '2'), ('2', '3'), ('1', '4')}
+    assert graph.get_edge('1', '4').weight == 2
+    assert graph.get_edge('1', '2').weight is None
+
+
+@pytest.mark.parametrize('vectorized', (False, True))
+@pytest.mark.parametrize('directional', (False, True))
+def test_read_adjacency_matrix_compact(vectorized, directional):
+    graph = read_adjacency_matrix(io.StringIO(_MATRIX), directional, compact=True, vectorized=vectorized)
+    expected = CompactGraph.from_graph(read_adjacency_matrix(io.StringIO(_MATRIX), directional))
+
+    assert graph.names == expected.names
+    assert graph.edge_count == expected.edge_count
+    for i in range(len(graph)):
+        assert sorted(zip(graph.adjacent(i), graph.adjacent_weights(i))) == sorted(
+            zip(expected.adjacent(i), expected.adjacent_weights(i))
+        )
+
+
+def test_read_adjacency_matrix_resource():
+    path = Path(__file__).parents[2] / 'resources' / 'graph1.txt'
+    graph = read_adjacency_matrix(path)
+    compact = read_adjacency_matrix(path, compact=True, vectorized=True)
+
+    assert len(graph) == len(compact) == 10
+    assert graph.edge_count == compact.edge_count
+    assert get_floyd_matrix(graph) == get_floyd_matrix(compact)
+
+
+def test_read_adjacency_matrix_ragged_row():
+    with pytest.raises(ValueError):
+        read_adjacency_matrix(io.StringIO('0, 1, \n1, 0, 0, \n'))
+
+
+@pytest.mark.parametrize(
+    'graph',
+    (
+        mkg(['e'], [('a', 'b'), ('b', 'c')]),
+        _mkdg([('a', 'b'), ('b', 'a'), ('c', 'c')]),
+        mkg(['-3'], [('a', 'b'), ('b', 'x y'), ('K_{1}', 'a"b'), ('node', '1.5'), ('é', 'a-b')]),
+    ),
+)
+def test_read_dot_round_trip(graph: Graph):
+    graph.get_vertex('a').set_dot_attributes({'shape': 'box', 'label': '"A, a"'})
+    graph.get_edge('a', 'b').set_dot_attributes({'label': 'ab', 'color': 'red'})
+
+    loaded = read_dot(io.StringIO(graph.dot))
+
+    assert type(loaded) is type(graph)
+    assert loaded.dot == graph.dot
+    assert [v.name for v in loaded] == [v.name for v in graph]
+    assert [(e.v1.name, e.v2.name) for e in loaded.edges] == [(e.v1.name, e.v2.name) for e in graph.edges]
+
+
+def test_read_dot_resource():
+    graph = read_dot(Path(__file__).parents[2] / 'resources' / 'graph2.dot')
+
+    assert graph.directional
+    assert len(graph) == 8
+    assert graph.edge_count == 12
+    assert graph.get_edge('KQS', 'QSU').dot_attributes == {'label': 'KQSU'}
+
+
+def test_read_dot_statements():
+    dot = """strict graph "my graph"
+    {
+        node [shape=circle]; edge [color=blue]
+        rankdir=LR
+        a -- b -- c [label=x]; "d e" [label="two
+    lines"]
+        // a comment
+        c:port -- a
+    }"""
+
+    graph = read_dot(io.StringIO(dot))
+
+    assert graph.label == 'my graph'
+    assert set(graph._edges.keys()) == {('a', 'b'), ('b', 'c'), ('c', 'a')}
+    assert graph.get_edge('b', 'c').dot_attributes == {'color': 'blue', 'label': 'x'}
+    assert graph.get_edge('c', 'a').dot_attributes == {'color': 'blue'}
+    assert graph.get_vertex('d e').dot_attributes == {'shape': 'circle', 'label': '"two\n    lines"'}
+
+
+@pytest.mark.parametrize(
+    'dot',
+    (
+        'graph G { a -> b }',
+        'graph G { a -- b ',
+        'graph G { subgraph { a } }',
+        'tree G { a }',
+    ),
+)
+def test_read_dot_errors(dot):
+    with pytest.raises(ValueError):
+        read_dot(io.StringIO(dot))
+
+
+@pytest.mark.parametrize('chunk_size', (1, 2, 4096))
+def test_write_dot(chunk_size):
+    graph = mkg(['e'], [('a', 'b'), ('b', 'c')])
+    shared = {'color': 'red'}
+    graph.get_edge('a', 'b').set_dot_attributes(shared)
+    graph.get_edge('b', 'c').set_dot_attributes(shared)
+    graph.get_vertex('a').set_dot_attributes({'shape': 'box'})
+    file = io.StringIO()
+
+    graph.write_dot(file, chunk_size)
+
+    assert file.getvalue() == graph.dot == (
+        'graph G {\n'
+        '    "e" \n'
+        '    "a" [shape=box]\n'
+        '    "b" \n'
+        '    "c" \n'
+        '    a -- b [color=red]\n'
+        '    b -- c [color=red]\n'
+        '}'
+    )
+
+
+@pytest.mark.parametrize(
+    'graph',
+    (
+        Graph(),
+        mkg(['z'], [('a', 'b'), ('c', 'b'), ('c', 'c'), ('d', 'a')]),
+        _mkdg([('a', 'b'), ('b', 'a'), ('b', 'c'), ('c', 'c')]),
+        _mkwg([('a', 'b', 2), ('b', 'c', 0.5)]),
+    ),
+)
+def test_snapshot_round_trip(tmp_path, graph: Graph):
+    if len(graph):
+        graph.vertices[0].set_dot_attributes({'shape': 'box'})
+    if graph.edge_count:
+        graph.edges[-1].set_dot_attributes({'label': '"x y"'})
+    path = tmp_path / 'graph.snapshot'
+
+    save_snapshot(graph, path)
+    loaded = load_snapshot(path)
+    compact = load_snapshot(path, compact=True)
+    expected = CompactGraph.from_graph(graph)
+
+    assert type(loaded) is type(graph)
+    assert loaded.dot == graph.dot
+    assert [e.weight for e in loaded.edges] == [e.weight for e in graph.edges]
+    assert compact.names == expected.names
+    assert compact.directional == graph.directional
+    assert compact.edge_count == graph.edge_count
+    for i in range(len(compact)):
+        assert list(zip(compact.adjacent(i), compact.adjacent_weights(i))) == list(
+            zip(expected.adjacent(i), expected.adjacent_weights(i))
+        )
+
+
+def test_snapshot_partial_weights(tmp_path):
+    graph = mkg(edges=[('a', 'b'), ('b', 'c')])
+    graph.get_edge('a', 'b').weight = 3
+    save_snapshot(graph, tmp_path / 'graph.snapshot')
+
+    assert [e.weight for e in load_snapshot(tmp_path / 'graph.snapshot').edges] == [3, None]
+    assert get_floyd_matrix(load_snapshot(tmp_path / 'graph.snapshot', compact=True)) == get_floyd_matrix(graph)
+
+
+def test_snapshot_bad_file(tmp_path):
+    path = tmp_path / 'graph.snapshot'
+    path.write_bytes(b'digraph G {}' * 10)
+
+    with pytest.raises(ValueError):
+        load_snapshot(path)
+
+
+def test_snapshot_truncated(tmp_path):
+    graph = _mkwg([('a', 'b', 2), ('b', 'c', 1.5)])
+    graph.get_vertex('a').set_dot_attributes({'shape': 'box'})
+    path = tmp_path / 'graph.snapshot'
+    save_snapshot(graph, path)
+    data = path.read_bytes()
+
+    truncated = tmp_path / 'truncated.snapshot'
+    for size in range(len(data)):
+        truncated.write_bytes(data[:size])
+        for compact in (False, True):
+            with pytest.raises(ValueError):
+                load_snapshot(truncated, compact=compact)
+
+
+def test_render_cache(tmp_path):
+    cache = RenderCache(tmp_path, max_size=10, memory_size=1)
+    key = RenderCache.make_key('graph G {}', {'format': 'tikz'})
+
+    assert key != RenderCache.make_key('graph G {}', {'format': 'pgf'})
+    assert cache.get(key) is None
+    cache[key] = 'tikz'
+    assert key in cache
+    assert RenderCache(tmp_path).get(key) == 'tikz'
+
+
+def test_render_cache_evicts_least_recently_used(tmp_path):
+    cache = RenderCache(tmp_path, max_size=8, memory_size=1)
+    cache['a'] = 'aaaa'
+    cache['b'] = 'bbbb'
+    os.utime(tmp_path / 'a.tex', (0, 0))
+    cache.get('b')
+
+    cache['c'] = 'cccc'
+
+    assert sorted(path.stem for path in tmp_path.glob('*.tex')) == ['b', 'c']
+    assert cache.get('a') is None
+
+
+def test_get_latex_tikz_string_cache(tmp_path, monkeypatch):
+    calls = []
+    monkeypatch.setattr(helpers, 'dot2tex', lambda dot, **options: calls.append(dot) or f'tikz {len(calls)}')
+    cache = RenderCache(tmp_path)
+    graph = mkg(edges=[('a', 'b')])
+
+    assert helpers.get_latex_tikz_string(graph, cache) == 'tikz 1'
+    assert helpers.get_latex_tikz_string(graph.dot, cache) == 'tikz 1'
+    assert helpers.get_latex_tikz_string(graph, RenderCache(tmp_path)) == 'tikz 1'
+    assert helpers.get_latex_tikz_string(graph, None) == 'tikz 2'
+    assert calls == [graph.dot, graph.dot]
+
+
+def _render_edge_count(dot: str) -> str:
+    # pool workers may be started without fork, so they only get a module level function, not patches
+    return f'tikz {dot.count("--")}'
+
+
+@pytest.mark.parametrize('workers', (1, 2))
+def test_get_latex_tikz_strings(tmp_path, workers):
+    cache = RenderCache(tmp_path)
+    graph = mkg(edges=[('a', 'b')])
+    cache[helpers._get_tikz_key(graph.dot)] = 'cached'
+    dots = [graph.dot]
+    graph.add_edge('b', 'c')
+    dots.append(graph)
+    dots.append(mkg(edges=[('a', 'b'), ('b', 'c'), ('c', 'd')]).dot)
+
+    assert helpers.get_latex_tikz_strings(dots, workers, cache, _render_edge_count) == ['cached', 'tikz 2', 'tikz 3']
+    assert helpers.get_latex_tikz_string(graph, cache) == 'tikz 2'
+
+
+def test_chromatic_polynom_cache_is_shared():
+    graph = mkg(edges=[('a', 'b'), ('b', 'c'), ('c', 'a'), ('c', 'd')])
+    poly = ChromaticPolynomCreator._get_chromatic_polynom(graph, 'O')
+
+    assert ChromaticPolynomCreator._get_chromatic_polynom(graph.copy(), 'O') is poly
+    assert str(poly - poly) != str(poly)
+    assert ChromaticPolynomCreator.get_chromatic_polynom(graph, 'O') == str(poly) == (
+        'O_{4} + (-4.0) * O_{3} + (5.0) * O_{2} + (-2.0) * O_{1}'
+    )
+
+
+@pytest.mark.parametrize(
+    'graph, expected_chromatic_number',
+    (
+        (mkg(), 0),
+        (mkg(['a', 'b']), 1),
+        (mkg(edges=[('a', 'b'), ('b', 'c'), ('c', 'd'), ('d', 'a')]), 2),
+        (mkg(edges=[('a', 'b'), ('b', 'c'), ('c', 'a'), ('c', 'd')]), 3),
+        (mkg(edges=[(a, b) for a in range(5) for b in range(a)]), 5),
+    ),
+)
+def test_chromatic_number(graph: Graph, expected_chromatic_number):
+    assert ChromaticPolynomCreator.chromatic_number(graph) == expected_chromatic_number
+
+
+def test_evaluate_chromatic_polynom():
+    graph = mkg(edges=[('a', 'b'), ('b', 'c'), ('c', 'a'), ('c', 'd')])
+
+    assert ChromaticPolynomCreator.evaluate(graph, range(6)).tolist() == [0, 0, 0, 12, 72, 240]
+    assert ChromaticPolynomCreator.evaluate(graph, [10 ** 6])[0] == 10 ** 6 * (10 ** 6 - 1) ** 2 * (10 ** 6 - 2)
+
+
+class _RecordingListener(GraphListener):
+    def __init__(self):
+        self.events = []
+
+    def on_vertex_added(self, graph, vertex):
+        self.events.append(('+v', vertex.name))
+
+    def on_vertex_removed(self, graph, vertex):
+        self.events.append(('-v', vertex.name))
+
+    def on_edge_added(self, graph, edge):
+        self.events.append(('+e', edge.v1.name, edge.v2.name, edge.weight))
+
+    def on_edge_removed(self, graph, edge):
+        self.events.append(('-e', edge.v1.name, edge.v2.name, edge.weight))
+
+
+def test_graph_listener():
+    graph = mkg(['a', 'b', 'c'])
+    listener = _RecordingListener()
+    graph.add_listener(listener)
+
+    graph.add_edge('a', 'b', 2)
+    graph.add_edge('b', 'c')
+    graph.remove_edge('a', 'b')
+    graph.remove_vertex('c')
+    graph.add_vertex('d')
+    assert listener.events == [
+        ('+e', 'a', 'b', 2), ('+e', 'b', 'c', None), ('-e', 'a', 'b', 2),
+        ('-e', 'b', 'c', None), ('-v', 'c'), ('+v', 'd'),
+    ]
+
+    assert graph.copy().listeners == graph.copy(lazy=True).listeners == ()
+    graph.remove_listener(listener)
+    graph.add_vertex('e')
+    assert listener.events[-1] == ('+v', 'd')
+
+
+@pytest.mark.parametrize(
+    'graph',
+    (
+        mkg(edges=[('a', 'b'), ('b', 'c'), ('c', 'd'), ('d', 'e'), ('e', 'a'), ('a', 'c')]),
+        _mkdg([('a', 'b'), ('b', 'c'), ('c', 'd'), ('d', 'a'), ('b', 'e')]),
+        _mkwg([('a', 'b', 5), ('b', 'c', 1), ('a', 'c', 1.5), ('c', 'd', 2), ('d', 'e', 0.5)]),
+    ),
+)
+def test_dynamic_distances(graph: Graph):
+    graph = graph.copy()
+    distances = DynamicDistances.attach(graph)
+    assert DynamicDistances.attach(graph) is distances
+
+    def check():
+        names = [v.name for v in graph]
+        expected = get_floyd_matrix(graph)
+        assert [[distances.get_distance(v1, v2) for v2 in names] for v1 in names] == expected
+        # a copy has no listeners, so the metrics below are computed from scratch
+        static = graph.copy()
+        assert DynamicDistances.get_attached(static) is None
+        assert distances.get_eccentricities() == get_eccentricities(static)
+        assert distances.radius == get_radius(static)
+        assert distances.diameter == get_diameter(static)
+        assert distances.centers == get_centers(static)
+
+    check()
+    graph.add_edge('e', 'b')
+    check()
+    graph.remove_edge('a', 'b')
+    check()
+    graph.add_vertex('f')
+    check()
+    graph.add_edge('f', 'a', 3)
+    check()
+    graph.remove_vertex('c')
+    check()
+
+    distances.detach()
+    assert DynamicDistances.get_attached(graph) is None
+
+
+def test_dynamic_distances_negative_weights():
+    graph = _mkdg([('a', 'b'), ('b', 'c'), ('c', 'a')])
+    distances = DynamicDistances.attach(graph)
+
+    graph.add_edge('a', 'c', -2)
+    graph.remove_edge('b', 'c')
+    graph.add_edge('c', 'b', -1)
+    assert distances.get_eccentricities() == get_eccentricities(graph.copy())
+
+
+def test_pickle_across_hash_seeds(tmp_path):
+    # str hashes are salted per process, a pickled vertex must not keep the old one
+    path = tmp_path / 'graph.pickle'
+    dump = (
+        'import pickle, sys\n'
+        'from graph.helpers import mkg\n'
+        'graph = mkg(edges=[("a", "b")])\n'
+        'graph.get_vertex("a").set_dot_attributes({"shape": "box"})\n'
+        'pickle.dump(graph, open(sys.argv[1], "wb"))\n'
+    )
+    load = (
+        'import pickle, sys\n'
+        'from graph.vertex import Vertex\n'
+        'graph = pickle.load(open(sys.argv[1], "rb"))\n'
+        'v = graph.get_vertex("a")\n'
+        'assert hash(v) == hash("a") and v == Vertex("a") and Vertex("a") in {v}\n'
+        'assert v.dot_attributes == {"shape": "box"}\n'
+        'assert graph.get_edge("a", "b").v1 == v\n'
+    )
+    cwd = Path(__file__).parents[1]
+    for seed, script in (('1', dump), ('2', load)):
+        env = {**os.environ, 'PYTHONHASHSEED': seed}
+        subprocess.run([sys.executable, '-c', script, str(path)], cwd=cwd, env=env, check=True)
+
+    vertex = pickle.loads(pickle.dumps(Vertex('a')))
+    assert vertex == Vertex('a') and hash(vertex) == hash('a')
@@ -1,9 +1,33 @@
+import re
+from typing import Dict, Optional
+
 from .dot_attributes_mixin import DotAttributesMixin
 
 
+# a DOT ID that needs no quotes: a name or a number, keywords excluded
+_DOT_ID = re.compile(r'[A-Za-z_\x80-\U0010ffff][A-Za-z_0-9\x80-\U0010ffff]*|-?(\.[0-9]+|[0-9]+(\.[0-9]*)?)')
+_DOT_KEYWORDS = frozenset(('node', 'edge', 'graph', 'digraph', 'subgraph', 'strict'))
+
+
+def quote_dot_id(name: str, force: bool = False) -> str:
+    '''
+    Write ``name`` as a DOT ID, quoted (with inner quotes escaped) unless it is a plain name or number.
+
+    :param force: Always quote.
+    '''
+    if not force and _DOT_ID.fullmatch(name) and name.lower() not in _DOT_KEYWORDS:
+        return name
+    escaped = name.replace('"', '\\"')
+    return f'"{escaped}"'
+
+
 class Vertex(DotAttributesMixin):
+    __slots__ = ('_name', '_hash')
+
     def __init__(self, name: str) -> None:
-        self.name = name
+        self._name = name
+        self._hash = hash(name)
+        self._dot_attributes = None
 
     def __repr__(self) -> str:
         return f'<{self.__class__.__name__} \'{self.name}\'>'
@@ -15,8 +39,23 @@ class Vertex(DotAttributesMixin):
         return hash(self) == hash(other)
 
     def __hash__(self) -> int:
-        return hash(self.name)
+        return self._hash
+
+    def __getstate__(self) -> tuple[str, Optional[Dict[str, str]]]:
+        # str hashes differ between processes, so the hash is computed again on load
+        return self._name, self._dot_attributes
+
+    def __setstate__(self, state: tuple[str, Optional[Dict[str, str]]]) -> None:
+        self._name, self._dot_attributes = state
+        self._hash = hash(self._name)
+
+    @property
+    def name(self) -> str:
+        return self._name
 
     @property
     def dot(self) -> str:
-        return f'"{self.name}" {self._get_attributes_string()}'
+        return self._get_dot(self._get_attributes_string())
+
+    def _get_dot(self, attributes: str) -> str:
+        return f'{quote_dot_id(self._name, force=True)} {attributes}'
@@ -1,6 +1,6 @@
 from base_task import BaseTask
 from graph.algorithms import PruferCodeCreator
-from graph.helpers import mkg, get_latex_tikz_string
+from graph.helpers import mkg, get_latex_tikz_strings
 from scripts.graph import Graph, Vertex
 
 
@@ -25,24 +25,26 @@ class Task4(BaseTask):
         root_vertex = g.get_vertex(5)
         root_vertex.update_dot_attributes({'color': 'blue'})
 
-        for i, (graph, code, m, p) in enumerate(self._gen_prufer_code_solution(g, root_vertex), start=1):
+        # the graph changes every step, so keep its DOT and the code as they are now
+        steps = [
+            (graph.dot, list(code), m)
+            for graph, code, m, p in self._gen_prufer_code_solution(g, root_vertex)
+        ]
+        figures = get_latex_tikz_strings([dot for dot, _, _ in steps])
+
+        for i, ((_, code, m), figure) in enumerate(zip(steps, figures), start=1):
             print(f'\\textbf{{Шаг {i}}}\n')
             print('Граф:')
-            print(get_latex_tikz_string(graph))
+            print(figure)
             print(f'Лист дерева с минимальным номером: {m.name}\n')
             print(f'Добавляем номер родителя минимального листа в код и убираем минимальный лист из графа.\n')
             print(f'Код: {", ".join([str(c) for c in code])}\n')
 
     def _gen_prufer_code_solution(self, graph: Graph, root: Vertex):
-        cls = PruferCodeCreator
         graph = graph.copy()
-        code_len = len(graph) - 2
         code = []
-        while len(code) < code_len:
-            leafs = cls.get_graph_leaves(graph, root, root)
-            min_leaf = min(leafs, key=lambda leaf: int(leaf.name))
+        for min_leaf, parent in PruferCodeCreator.iter_prufer_code(graph, root):
             min_leaf.update_dot_attributes({'color': 'red'})
-            parent = cls.get_parent(graph, root, min_leaf)
             parent.update_dot_attributes({'color': 'green'})
             code.append(int(parent.name))
 